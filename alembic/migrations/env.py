@@ -4,7 +4,13 @@ from sqlalchemy import engine_from_config, pool
 
 from alembic import context
 from config import configuration as cfg
-from source.api.v1.banner.models import BannerORM, BannerTagORM, FeatureORM, TagORM
+from source.api.v1.banner.models import (
+    BannerFeatureTagORM,
+    BannerORM,
+    BannerTagORM,
+    FeatureORM,
+    TagORM,
+)
 from source.database import BaseORM
 
 # this is the Alembic Config object, which provides
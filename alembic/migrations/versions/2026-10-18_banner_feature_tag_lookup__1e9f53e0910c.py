@@ -0,0 +1,102 @@
+"""banner feature tag lookup
+
+Revision ID: 1e9f53e0910c
+Revises: 0968f547eba9
+Create Date: 2026-10-18 09:12:41.204913
+
+"""
+
+import logging
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "1e9f53e0910c"
+down_revision: Union[str, None] = "0968f547eba9"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+logger = logging.getLogger("alembic.runtime.migration")
+
+
+def upgrade() -> None:
+    op.create_table(
+        "banner_feature_tag",
+        sa.Column("feature_id", sa.BIGINT(), nullable=False),
+        sa.Column("tag_id", sa.BIGINT(), nullable=False),
+        sa.Column("banner_id", sa.BIGINT(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False),
+        sa.ForeignKeyConstraint(["banner_id"], ["public.banner.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["feature_id"], ["public.feature.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["tag_id"], ["public.tag.id"], ondelete="CASCADE"),
+        # covering primary key: the user banner lookup is answered by an index-only scan
+        sa.PrimaryKeyConstraint(
+            "feature_id",
+            "tag_id",
+            name="banner_feature_tag_pkey",
+            postgresql_include=["banner_id"],
+        ),
+        schema="public",
+    )
+    op.create_index(
+        op.f("ix_public_banner_feature_tag_banner_id"),
+        "banner_feature_tag",
+        ["banner_id"],
+        unique=False,
+        schema="public",
+    )
+    op.create_index(
+        op.f("ix_public_banner_feature_id"), "banner", ["feature_id"], unique=False, schema="public"
+    )
+    op.create_index(
+        op.f("ix_public_banner_tag_tag_id"), "banner_tag", ["tag_id"], unique=False, schema="public"
+    )
+    # existing data may already violate the rule: the oldest banner keeps the relation
+    # and the tags of the other banners sharing it are removed, so that banner_tag
+    # stays in agreement with banner_feature_tag
+    op.execute(
+        """
+        INSERT INTO public.banner_feature_tag (feature_id, tag_id, banner_id, created_at, updated_at)
+        SELECT DISTINCT ON (b.feature_id, bt.tag_id) b.feature_id, bt.tag_id, b.id, now(), now()
+        FROM public.banner b
+        JOIN public.banner_tag bt ON bt.banner_id = b.id
+        ORDER BY b.feature_id, bt.tag_id, b.id
+        """
+    )
+    removed_banner_tags = op.get_bind().execute(
+        sa.text(
+            """
+            DELETE FROM public.banner_tag bt
+            USING public.banner b, public.banner_feature_tag bft
+            WHERE b.id = bt.banner_id
+              AND bft.feature_id = b.feature_id
+              AND bft.tag_id = bt.tag_id
+              AND bft.banner_id <> bt.banner_id
+            RETURNING bt.banner_id, bt.tag_id, b.feature_id, bft.banner_id
+            """
+        )
+    )
+    for banner_id, tag_id, feature_id, kept_banner_id in removed_banner_tags:
+        logger.warning(
+            "Removed tag %s from banner %s: feature %s and tag %s already identify banner %s",
+            tag_id,
+            banner_id,
+            feature_id,
+            tag_id,
+            kept_banner_id,
+        )
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_public_banner_tag_tag_id"), table_name="banner_tag", schema="public")
+    op.drop_index(op.f("ix_public_banner_feature_id"), table_name="banner", schema="public")
+    op.drop_index(
+        op.f("ix_public_banner_feature_tag_banner_id"),
+        table_name="banner_feature_tag",
+        schema="public",
+    )
+    op.drop_table("banner_feature_tag", schema="public")
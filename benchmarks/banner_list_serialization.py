@@ -0,0 +1,102 @@
+"""
+Cost of encoding a GET /banner page.
+
+Compares the response_model path (FastAPI validates every row against
+list[BannerFullInfoSchema], dumps it to JSON-able Python and JSONResponse encodes it)
+with the orjson path (rows in the response shape encoded as is), per page of --rows rows.
+Time is measured without tracing, allocations as the tracemalloc peak of one page.
+
+No database needed, rows are generated:
+    python -m benchmarks.banner_list_serialization --rows 1000 --iterations 200
+"""
+
+import argparse
+import asyncio
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from typing import Awaitable, Callable
+
+import orjson
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+from source.api.v1.banner import schemas
+from source.api.v1.banner.dao import BannerDAO
+from source.api.v1.banner.service import JSON_OPTIONS
+
+RESPONSE_FIELD = create_response_field(
+    name="Response_Get_Banner", type_=list[schemas.BannerFullInfoSchema]
+)
+
+
+def make_rows(count: int) -> list[tuple]:
+    now = datetime.now(timezone.utc)
+    return [
+        (
+            banner_id,
+            f"Скидка {banner_id}% на все товары",
+            "Только до конца недели..." * 4,
+            f"https://example.com/sale/{banner_id}",
+            banner_id % 2 == 0,
+            now,
+            now,
+            banner_id % 100 + 1,
+            [1, 2, 3],
+        )
+        for banner_id in range(1, count + 1)
+    ]
+
+
+async def encode_with_response_model(rows: list[tuple]) -> bytes:
+    banners = [BannerDAO._to_full_info(row) for row in rows]
+    content = await serialize_response(field=RESPONSE_FIELD, response_content=banners)
+    return JSONResponse(content).body
+
+
+async def encode_with_orjson(rows: list[tuple]) -> bytes:
+    banners = [BannerDAO._to_full_info(row) for row in rows]
+    return orjson.dumps(banners, option=JSON_OPTIONS)
+
+
+async def measure(
+    name: str, encode: Callable[[list[tuple]], Awaitable[bytes]], rows: list[tuple], iterations: int
+) -> tuple[float, int]:
+    for _ in range(min(iterations, 20)):
+        await encode(rows)
+    start = time.perf_counter()
+    for _ in range(iterations):
+        await encode(rows)
+    per_page = (time.perf_counter() - start) / iterations
+
+    tracemalloc.start()
+    await encode(rows)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(f"{name:<15} {per_page * 1e3:8.2f} ms/page {peak / 1024:10.1f} KiB peak")
+    return per_page, peak
+
+
+async def main(rows_count: int, iterations: int) -> None:
+    rows = make_rows(rows_count)
+    same = await encode_with_response_model(rows) == await encode_with_orjson(rows)
+    print(f"{rows_count} rows per page, identical output: {same}")
+
+    model_time, model_peak = await measure(
+        "response_model", encode_with_response_model, rows, iterations
+    )
+    orjson_time, orjson_peak = await measure("orjson", encode_with_orjson, rows, iterations)
+    print(
+        f"{model_time / orjson_time:.1f}x faster, "
+        f"{model_peak / orjson_peak:.1f}x smaller allocation peak"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+    asyncio.run(main(args.rows, args.iterations))
@@ -0,0 +1,117 @@
+"""
+Per-request cost of logging with the settings of logging_config.json.
+
+A request logs two lines through app.logger (ProcessTimeLogMiddleware) and one uvicorn
+access line through the stdlib InterceptHandler. Each configuration is set up with
+CustomizeLogger.customize_logging, writing to a temporary directory (stdout is discarded),
+and timed until the sinks have written every message, background thread included.
+
+No database needed:
+    python -m benchmarks.logging_overhead --messages 20000
+"""
+
+import argparse
+import logging
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable
+
+from loguru import logger
+
+from customize_logger import CustomizeLogger
+
+CONFIG_PATH = Path(__file__).parent.parent / "logging_config.json"
+
+# enqueue sends every message through a multiprocessing queue, which costs more
+# than the buffered write it moves off the calling thread
+THROUGHPUT_OPTIONS = {
+    "serialize": True,
+    "enqueue": False,
+    "file_buffer_size": 65536,
+    "find_caller": False,
+    "access_log_sample_rate": 0.01,
+}
+CONFIGURATIONS = {
+    "default": {},
+    "throughput with enqueue": {**THROUGHPUT_OPTIONS, "enqueue": True},
+    "throughput": THROUGHPUT_OPTIONS,
+}
+
+
+def configure(directory: str, options: dict):
+    config = CustomizeLogger.load_logging_config(CONFIG_PATH)["logger"]
+    stdout = sys.stdout
+    sys.stdout = open(os.devnull, "w")
+    try:
+        app_logger = CustomizeLogger.customize_logging(
+            Path(directory) / "app.log",
+            level=config["level"],
+            rotation=config["rotation"],
+            retention=config["retention"],
+            format=config["format"],
+            **options,
+        )
+    finally:
+        sys.stdout = stdout
+    # uvicorn does not propagate access records to the root logger
+    logging.getLogger("uvicorn.access").propagate = False
+    return app_logger
+
+
+def measure(name: str, log: Callable[[], None], messages: int) -> float:
+    start = time.perf_counter()
+    for _ in range(messages):
+        log()
+    logger.complete()
+    per_message = (time.perf_counter() - start) / messages
+    print(f"  {name:<16} {per_message * 1e6:8.2f} us/message")
+    return per_message
+
+
+def main(messages: int) -> None:
+    access_logger = logging.getLogger("uvicorn.access")
+    service_logger = logging.getLogger("source.api.v1.banner.service")
+
+    for configuration, options in CONFIGURATIONS.items():
+        with tempfile.TemporaryDirectory() as directory:
+            app_logger = configure(directory, options)
+            print(configuration)
+
+            def app_line():
+                app_logger.info(
+                    "Request {}{} for operation {} completed from IP {} with status {} in {:0.3f}"
+                    " seconds",
+                    "548e-",
+                    17,
+                    "/user_banner",
+                    "127.0.0.1",
+                    200,
+                    0.0012,
+                )
+
+            def access_line():
+                access_logger.info(
+                    '%s - "%s %s HTTP/%s" %d',
+                    "127.0.0.1:50000",
+                    "GET",
+                    "/user_banner?tag_id=1&feature_id=1",
+                    "1.1",
+                    200,
+                )
+
+            app = measure("app.logger", app_line, messages)
+            access = measure("access log", access_line, messages)
+            measure("stdlib logger", lambda: service_logger.info("Banner %s stored", 17), messages)
+            measure("disabled debug", lambda: app_logger.debug("Banner {} stored", 17), messages)
+            measure("stdlib debug", lambda: service_logger.debug("Banner %s stored", 17), messages)
+            print(f"  per request      {(2 * app + access) * 1e6:8.2f} us")
+            logger.remove()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--messages", type=int, default=20000)
+    main(parser.parse_args().messages)
@@ -0,0 +1,138 @@
+"""
+Throughput of GET /user_banner through the request log middleware.
+
+Compares an application without the middleware, the previous BaseHTTPMiddleware
+implementation and the pure ASGI ProcessTimeLogMiddleware (logging every request and
+with --sample-rate). Requests are sent straight to the ASGI application, the endpoint
+returns a pre-encoded body and the logger discards messages after formatting them,
+so the numbers show the cost of the middleware itself.
+
+No database needed:
+    python -m benchmarks.middleware_throughput --requests 20000 --sample-rate 0.01
+"""
+
+import argparse
+import asyncio
+import random
+import string
+import time
+
+from fastapi import FastAPI, Request, Response
+from loguru import logger
+from starlette.middleware.base import BaseHTTPMiddleware, RequestResponseEndpoint
+
+from source.middleware.request_process_time_log import ProcessTimeLogMiddleware
+
+BODY = b'{"title":"some_title","text":"some_text","url":"https://example.com"}'
+
+
+class BaseHTTPProcessTimeLogMiddleware(BaseHTTPMiddleware):
+    """
+    ProcessTimeLogMiddleware before it was rewritten as a pure ASGI middleware
+    """
+
+    async def dispatch(self, request: Request, call_next: RequestResponseEndpoint):
+        req_uid = "".join(random.choices(string.ascii_uppercase + string.digits, k=16))
+        start_time = time.time()
+        request_params = request.query_params
+        request.app.logger.info(
+            f"Request {req_uid} for operation {request.url.path}"
+            f" received from IP {request.client.host}"
+            f"{'with params ' + str(request_params) if request_params else ''}"
+        )
+        response = await call_next(request)
+        time_spent = f"{(time.time() - start_time):0.3f} seconds"
+        request.app.logger.info(
+            f"Request {req_uid} for operation {request.url.path}"
+            f" completed from IP {request.client.host} in {time_spent}"
+        )
+        return response
+
+
+def make_app(middleware: type | None = None, **options) -> FastAPI:
+    app = FastAPI()
+    app.logger = logger.bind(request_id=None, method=None)  # type: ignore
+
+    @app.get("/user_banner")
+    async def get_user_banner(tag_id: int, feature_id: int):
+        return Response(content=BODY, media_type="application/json")
+
+    if middleware is not None:
+        app.add_middleware(middleware_class=middleware, **options)
+    return app
+
+
+async def request(app: FastAPI) -> None:
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": "/user_banner",
+        "raw_path": b"/user_banner",
+        "root_path": "",
+        "query_string": b"tag_id=1&feature_id=1",
+        "headers": [(b"host", b"testserver"), (b"token", b"user_token")],
+        "client": ("127.0.0.1", 50000),
+        "server": ("testserver", 80),
+    }
+
+    request_sent = False
+
+    async def receive():
+        # like a server: the request body once, then nothing until the client disconnects
+        nonlocal request_sent
+        if request_sent:
+            await asyncio.Event().wait()
+        request_sent = True
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    await app(scope, receive, send)
+
+
+async def measure(name: str, app: FastAPI, requests: int) -> float:
+    for _ in range(min(requests, 1000)):
+        await request(app)
+    start = time.perf_counter()
+    for _ in range(requests):
+        await request(app)
+    rps = requests / (time.perf_counter() - start)
+    print(f"{name:<22} {rps:10.0f} requests/s {1e6 / rps:8.1f} us/request")
+    return rps
+
+
+async def main(requests: int, sample_rate: float) -> None:
+    logger.remove()
+    logger.add(lambda message: None, level="INFO")
+
+    baseline = await measure("no middleware", make_app(), requests)
+    before = await measure(
+        "BaseHTTPMiddleware", make_app(BaseHTTPProcessTimeLogMiddleware), requests
+    )
+    after = await measure(
+        "ASGI, every request",
+        make_app(ProcessTimeLogMiddleware, sample_rate=1.0),
+        requests,
+    )
+    sampled = await measure(
+        f"ASGI, sampled {sample_rate:g}",
+        make_app(ProcessTimeLogMiddleware, sample_rate=sample_rate),
+        requests,
+    )
+    print(
+        f"middleware cost, us/request: BaseHTTPMiddleware {1e6 / before - 1e6 / baseline:.1f},"
+        f" ASGI {1e6 / after - 1e6 / baseline:.1f},"
+        f" ASGI sampled {1e6 / sampled - 1e6 / baseline:.1f}"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--sample-rate", type=float, default=0.01)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.sample_rate))
@@ -0,0 +1,89 @@
+"""
+Per-call cost of the GET /user_banner database lookup.
+
+Compares the ORM path the endpoint used before (get_banner_by_tag_and_feature below:
+new select, session, transaction and BannerORM hydration) with the prepared ORM-free path
+(BannerDAO.get_banner_record_by_tag_and_feature).
+
+Runs against the database configured in .env, at least one banner must exist:
+    python -m benchmarks.user_banner_query --iterations 5000
+"""
+
+import argparse
+import asyncio
+import time
+from contextlib import aclosing
+from typing import Awaitable, Callable
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+
+from source.api.v1.banner.dao import BannerDAO
+from source.api.v1.banner.models import BannerORM, BannerTagORM
+from source.database import async_engine, async_session_factory
+
+
+async def get_banner_by_tag_and_feature(
+    session: AsyncSession, feature_id: int, tag_id: int
+) -> BannerORM | None:
+    """
+    BannerDAO.get_banner_by_tag_and_feature before the ORM-free path replaced it
+    """
+    b = aliased(BannerORM)
+    bt = aliased(BannerTagORM)
+
+    query = (
+        select(b)
+        .join(bt, b.id == bt.banner_id)
+        .filter(b.feature_id == feature_id)
+        .filter(bt.tag_id == tag_id)
+    )
+
+    banner_orm = await session.execute(query)
+    return banner_orm.scalar_one_or_none()
+
+
+async def measure(name: str, call: Callable[[], Awaitable], iterations: int) -> float:
+    for _ in range(min(iterations, 200)):
+        await call()
+    start = time.perf_counter()
+    for _ in range(iterations):
+        await call()
+    per_call = (time.perf_counter() - start) / iterations
+    print(f"{name:<10} {per_call * 1e6:8.1f} us/call")
+    return per_call
+
+
+async def main(iterations: int) -> None:
+    async with async_session_factory() as session:
+        async with aclosing(BannerDAO.stream_banner_mappings(session, batch_size=1)) as batches:
+            batch = await anext(batches, None)
+    if not batch:
+        print("No banners in the database")
+        return
+    feature_id, tag_id, _ = batch[0]
+
+    async def orm_lookup():
+        async with async_session_factory() as session:
+            async with session.begin():
+                return await get_banner_by_tag_and_feature(
+                    session, feature_id=feature_id, tag_id=tag_id
+                )
+
+    orm = await measure("orm", orm_lookup, iterations)
+    prepared = await measure(
+        "prepared",
+        lambda: BannerDAO.get_banner_record_by_tag_and_feature(
+            feature_id=feature_id, tag_id=tag_id
+        ),
+        iterations,
+    )
+    print(f"saved {(orm - prepared) * 1e6:.1f} us/call ({orm / prepared:.2f}x)")
+    await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--iterations", type=int, default=5000)
+    asyncio.run(main(parser.parse_args().iterations))
@@ -34,6 +34,18 @@ class Config(BaseSettings):
             f"{self.DB_HOST}:{self.DB_PORT}/{self.DB_NAME}"
         )
 
+    # connection pool: DB_POOL_SIZE connections are opened on startup,
+    # up to DB_MAX_OVERFLOW more are opened under load,
+    # a request waits DB_POOL_TIMEOUT seconds for a free connection at most
+    DB_POOL_SIZE: int = 20
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 5
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = False
+    DB_CONNECT_TIMEOUT: float = 5
+    # asyncpg prepared statements cached per connection
+    DB_PREPARED_STATEMENT_CACHE_SIZE: int = 100
+
     TEST_DB_HOST: str
     TEST_DB_PORT: int
     TEST_DB_USER: str
@@ -56,6 +68,37 @@ class Config(BaseSettings):
     def REDIS_URL(self):
         return f"redis://{self.REDIS_HOST}:{self.REDIS_PORT}/0"
 
+    # full reload period of the in-process (feature_id, tag_id) index, seconds
+    BANNER_INDEX_REFRESH_INTERVAL: float = 60
+    BANNER_INDEX_LOAD_BATCH_SIZE: int = 5000
+    # banners read from the database cursor per batch by GET /banner/export
+    BANNER_EXPORT_BATCH_SIZE: int = 1000
+    # startup budget for loading the index and caches, the worker is not ready until they load
+    BANNER_WARMUP_TIMEOUT: float = 10
+    # user banner cache: in-process tier (L1) and redis tier (L2), TTLs in seconds.
+    # Stale entries (older than SOFT_TTL) are served while refreshed in background,
+    # HARD_TTL must not exceed the allowed 5 minutes of staleness.
+    # Every TTL is shortened by a random part of TTL_JITTER (0.1 -> up to 10%)
+    BANNER_CACHE_L1_MAXSIZE: int = 50_000
+    BANNER_CACHE_L1_TTL: float = 30
+    BANNER_CACHE_SOFT_TTL: float = 240
+    BANNER_CACHE_HARD_TTL: float = 300
+    BANNER_CACHE_TTL_JITTER: float = 0.1
+    # GET /user_banner/bundle: features kept in the in-process tier (other TTLs as above)
+    # and the Cache-Control max-age clients may reuse a bundle for without revalidation
+    BANNER_BUNDLE_CACHE_L1_MAXSIZE: int = 1000
+    BANNER_BUNDLE_MAX_AGE: int = 60
+    # background DELETE /banner/: banners deleted per transaction and pause between batches,
+    # seconds, so that user reads always get a pool connection and row locks stay short
+    BANNER_DELETE_BATCH_SIZE: int = 500
+    BANNER_DELETE_BATCH_PAUSE: float = 0.05
+    # finished background jobs are reported by GET /jobs/{id} for this long, seconds
+    JOB_RESULT_TTL: float = 3600
+    # request log: share of requests logged (0..1, 1 logs every request),
+    # requests slower than the threshold (seconds) are logged as warnings regardless
+    LOG_REQUEST_SAMPLE_RATE: float = 1.0
+    LOG_SLOW_REQUEST_THRESHOLD: float = 0.5
+
     model_config = SettingsConfigDict(env_file=".env", env_ignore_empty=False)
 
 
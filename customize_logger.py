@@ -2,9 +2,12 @@
 
 import json
 import logging
+import random
 import sys
+import traceback
 from pathlib import Path
 
+import orjson
 from loguru import logger
 
 
@@ -18,12 +21,25 @@ class InterceptHandler(logging.Handler):
         0: "NOTSET",
     }
 
+    def __init__(self, find_caller: bool = True):
+        super().__init__()
+        # walking the stack makes loguru report the module and function which logged the
+        # record, without it they are taken from the stdlib record and bound as extra
+        self.find_caller = find_caller
+
     def emit(self, record):
         try:
             level = logger.level(record.levelname).name
         except AttributeError:
             level = self.loglevel_mapping[record.levelno]
 
+        if not self.find_caller:
+            log = logger.bind(
+                request_id="app", logger=record.name, function=record.funcName, line=record.lineno
+            )
+            log.opt(exception=record.exc_info).log(level, record.getMessage())
+            return
+
         frame, depth = logging.currentframe(), 2
         while frame.f_code.co_filename == logging.__file__:
             frame = frame.f_back
@@ -33,6 +49,47 @@ class InterceptHandler(logging.Handler):
         log.opt(depth=depth, exception=record.exc_info).log(level, record.getMessage())
 
 
+class AccessLogSampler(logging.Filter):
+    """
+    Passes a `rate` share of access log records and every record above INFO.
+    Rejected records are never formatted
+    """
+
+    def __init__(self, rate: float):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record):
+        return record.levelno > logging.INFO or random.random() < self.rate
+
+
+def _json_format(record):
+    """
+    Loguru format writing the record as one line of JSON,
+    serialized once and shared by all sinks through extra["json"]
+    """
+    extra = record["extra"]
+    if "json" not in extra:
+        extra["json"] = _serialize_record(record)
+    return "{extra[json]}\n"
+
+
+def _serialize_record(record) -> str:
+    extra = record["extra"]
+    data = {
+        "time": record["time"].isoformat(),
+        "level": record["level"].name,
+        "message": record["message"],
+        "logger": record["name"],
+        "function": record["function"],
+        "line": record["line"],
+        **extra,
+    }
+    if record["exception"] is not None:
+        data["exception"] = "".join(traceback.format_exception(*record["exception"]))
+    return orjson.dumps(data, default=str).decode()
+
+
 class CustomizeLogger:
     @classmethod
     def make_logger(cls, config_path: Path):
@@ -45,29 +102,64 @@ class CustomizeLogger:
             retention=logging_config.get("retention"),
             rotation=logging_config.get("rotation"),
             format=logging_config.get("format"),
+            serialize=logging_config.get("serialize", False),
+            enqueue=logging_config.get("enqueue", True),
+            backtrace=logging_config.get("backtrace", True),
+            file_buffer_size=logging_config.get("file_buffer_size", 1),
+            find_caller=logging_config.get("find_caller", True),
+            access_log_sample_rate=logging_config.get("access_log_sample_rate", 1.0),
         )
         return logger
 
     @classmethod
     def customize_logging(
-        cls, filepath: Path, level: str, rotation: str, retention: str, format: str
+        cls,
+        filepath: Path,
+        level: str,
+        rotation: str,
+        retention: str,
+        format: str,
+        serialize: bool = False,
+        enqueue: bool = True,
+        backtrace: bool = True,
+        file_buffer_size: int = 1,
+        find_caller: bool = True,
+        access_log_sample_rate: float = 1.0,
     ):
+        """
+        `serialize` writes every record as one line of JSON instead of `format`,
+        `file_buffer_size` > 1 makes the file sink write in chunks of that many bytes
+        (1 writes every record at once, the rest is written at the latest on shutdown),
+        with `enqueue` sinks write from a background thread
+        """
         logger.remove()
-        logger.add(sys.stdout, enqueue=True, backtrace=True, level=level.upper(), format=format)
+        if serialize:
+            format = _json_format
+        logger.add(
+            sys.stdout, enqueue=enqueue, backtrace=backtrace, level=level.upper(), format=format
+        )
         logger.add(
             str(filepath),
             rotation=rotation,
             retention=retention,
-            enqueue=True,
-            backtrace=True,
+            enqueue=enqueue,
+            backtrace=backtrace,
             level=level.upper(),
             format=format,
+            buffering=file_buffer_size,
         )
-        logging.basicConfig(handlers=[InterceptHandler()], level=0)
-        logging.getLogger("uvicorn.access").handlers = [InterceptHandler()]
+        # records below the level are rejected by the stdlib loggers before they are created
+        logging.basicConfig(handlers=[InterceptHandler(find_caller)], level=level.upper())
+        access_logger = logging.getLogger("uvicorn.access")
+        access_logger.handlers = [InterceptHandler(find_caller)]
+        for _filter in list(access_logger.filters):
+            if isinstance(_filter, AccessLogSampler):
+                access_logger.removeFilter(_filter)
+        if access_log_sample_rate < 1:
+            access_logger.addFilter(AccessLogSampler(access_log_sample_rate))
         for _log in ["uvicorn", "uvicorn.error", "fastapi"]:
             _logger = logging.getLogger(_log)
-            _logger.handlers = [InterceptHandler()]
+            _logger.handlers = [InterceptHandler(find_caller)]
 
         return logger.bind(request_id=None, method=None)
 
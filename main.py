@@ -1,3 +1,4 @@
+import asyncio
 import logging
 from pathlib import Path
 from typing import Any
@@ -7,14 +8,23 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.openapi.docs import get_swagger_ui_html
 from fastapi.openapi.utils import get_openapi
 from fastapi.responses import HTMLResponse, RedirectResponse
-from fastapi_cache import FastAPICache
-from fastapi_cache.backends.redis import RedisBackend
 from redis import asyncio as aioredis
 
 from config import configuration
 from customize_logger import CustomizeLogger
+from source.api.v1.banner import service as banner_service
+from source.api.v1.banner.cache import banner_cache, feature_bundle_cache
+from source.api.v1.banner.dao import USER_BANNER_QUERY
+from source.api.v1.banner.index import banner_index
 from source.api.v1.banner.router import router as banner_router
+from source.api.v1.health.router import router as health_router
+from source.api.v1.jobs.router import router as jobs_router
+from source.api.v1.metrics.router import router as metrics_router
 from source.api.v1.set_header.router import router as set_header_router
+from source.cache import RedisCache
+from source.database import warm_up_pool
+from source.jobs import job_registry
+from source.metrics import MetricsMiddleware
 from source.middleware import request_process_time_log
 
 logger = logging.getLogger(__name__)
@@ -34,6 +44,9 @@ app.logger = logger  # type: ignore
 
 app.include_router(banner_router)
 app.include_router(set_header_router)
+app.include_router(health_router)
+app.include_router(jobs_router)
+app.include_router(metrics_router)
 app.add_middleware(middleware_class=request_process_time_log.ProcessTimeLogMiddleware)
 app.add_middleware(
     middleware_class=CORSMiddleware,
@@ -47,18 +60,42 @@ app.add_middleware(
         "Access-Control-Allow-Headers",
         "Authorization",
         "token",
+        "If-None-Match",
     ],
+    expose_headers=["X-Next-Cursor", "ETag"],
 )
+# outermost, so the recorded duration includes the other middleware
+app.add_middleware(middleware_class=MetricsMiddleware)
 
 
 @app.on_event("startup")
 async def startup_event():
-    redis = aioredis.from_url(
-        url=configuration.REDIS_URL,
-        encoding="utf-8",
-        decode_responses=True,
+    redis = aioredis.from_url(url=configuration.REDIS_URL)
+    app.state.redis = redis
+    # versioned: values written with another L2 header layout are not read back
+    banner_cache.l2 = RedisCache(redis, prefix="banner:v2", ttl=configuration.BANNER_CACHE_HARD_TTL)
+    feature_bundle_cache.l2 = RedisCache(
+        redis, prefix="banner:v2", ttl=configuration.BANNER_CACHE_HARD_TTL
     )
-    FastAPICache.init(RedisBackend(redis), prefix="fastapi-cache")
+    try:
+        async with asyncio.timeout(configuration.BANNER_WARMUP_TIMEOUT):
+            await warm_up_pool([(USER_BANNER_QUERY, {"feature_id": 0, "tag_id": 0})])
+            await banner_service.warm_up()
+    except TimeoutError:
+        logger.warning(
+            f"Banner warm-up did not finish in {configuration.BANNER_WARMUP_TIMEOUT} seconds,"
+            " the worker stays not ready until the banner index is loaded"
+        )
+    except Exception as e:
+        logger.error(f"Error while warming up banners: {e}")
+    banner_index.start_refreshing(configuration.BANNER_INDEX_REFRESH_INTERVAL)
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    await banner_index.stop_refreshing()
+    await job_registry.cancel_all()
+    await app.state.redis.close()
 
 
 @app.get("/")
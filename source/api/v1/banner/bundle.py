@@ -0,0 +1,49 @@
+import hashlib
+from typing import NamedTuple
+
+import orjson
+
+# strong ETag: quoted hex digest of the body
+ETAG_SIZE = 34
+
+
+class FeatureBundle(NamedTuple):
+    """
+    Pre-encoded GET /user_banner/bundle response of one feature
+    """
+
+    etag: str
+    body: bytes
+
+
+def make_feature_bundle(banners: list[tuple[int, str, str, str]]) -> FeatureBundle:
+    """
+    Encodes (tag_id, title, text, url) rows as {"<tag_id>": {"title", "text", "url"}}
+    """
+    body = orjson.dumps(
+        {
+            tag_id: {"title": title, "text": text, "url": url}
+            for tag_id, title, text, url in banners
+        },
+        option=orjson.OPT_NON_STR_KEYS,
+    )
+    return FeatureBundle(f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"', body)
+
+
+def encode_feature_bundle(bundle: FeatureBundle) -> bytes:
+    return bundle.etag.encode() + bundle.body
+
+
+def decode_feature_bundle(data: bytes) -> FeatureBundle:
+    return FeatureBundle(data[:ETAG_SIZE].decode(), data[ETAG_SIZE:])
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """
+    If-None-Match check with weak comparison, as RFC 9110 requires for GET
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
@@ -0,0 +1,56 @@
+import struct
+
+from config import configuration as cfg
+from source.cache import LRUTTLCache, TwoTierCache, cache_metrics_collector
+from source.metrics import metrics_registry
+
+from .bundle import FeatureBundle, decode_feature_bundle, encode_feature_bundle
+from .index import banner_index
+from .records import BannerRecord
+
+# banner_id and active flag in front of the pre-encoded body
+_BANNER_HEADER = struct.Struct("!q?")
+_BANNER_HEADER_SIZE = _BANNER_HEADER.size
+
+
+def user_banner_key(feature_id: int, tag_id: int) -> str:
+    return f"user_banner_body:{feature_id}:{tag_id}"
+
+
+def feature_bundle_key(feature_id: int) -> str:
+    return f"feature_bundle:{feature_id}"
+
+
+def _encode_banner(banner: BannerRecord) -> bytes:
+    return _BANNER_HEADER.pack(banner.banner_id, banner.active) + banner.body
+
+
+def _decode_banner(data: bytes) -> BannerRecord:
+    banner_id, active = _BANNER_HEADER.unpack_from(data)
+    return BannerRecord(banner_id, active, data[_BANNER_HEADER_SIZE:])
+
+
+banner_cache: TwoTierCache[BannerRecord] = TwoTierCache(
+    l1=LRUTTLCache(maxsize=cfg.BANNER_CACHE_L1_MAXSIZE, ttl=cfg.BANNER_CACHE_L1_TTL),
+    encode=_encode_banner,
+    decode=_decode_banner,
+    soft_ttl=cfg.BANNER_CACHE_SOFT_TTL,
+    hard_ttl=cfg.BANNER_CACHE_HARD_TTL,
+    jitter=cfg.BANNER_CACHE_TTL_JITTER,
+)
+
+feature_bundle_cache: TwoTierCache[FeatureBundle] = TwoTierCache(
+    l1=LRUTTLCache(maxsize=cfg.BANNER_BUNDLE_CACHE_L1_MAXSIZE, ttl=cfg.BANNER_CACHE_L1_TTL),
+    encode=encode_feature_bundle,
+    decode=decode_feature_bundle,
+    soft_ttl=cfg.BANNER_CACHE_SOFT_TTL,
+    hard_ttl=cfg.BANNER_CACHE_HARD_TTL,
+    jitter=cfg.BANNER_CACHE_TTL_JITTER,
+)
+
+metrics_registry.register_collector(
+    cache_metrics_collector(
+        {"banner": banner_cache, "feature_bundle": feature_bundle_cache},
+        indexes={"banner": banner_index},
+    )
+)
@@ -4,3 +4,8 @@ INTERNAL_SERVER_ERROR_SWAGGER_RESPONSE = {
         "text/plain": {"example": "Внутренняя ошибка сервера"},
     },
 }
+
+# pairs resolved by one POST /user_banner/batch request at most
+USER_BANNER_BATCH_MAX_SIZE = 1000
+# banners created by one POST /banner/bulk request at most
+BANNER_BULK_CREATE_MAX_SIZE = 1000
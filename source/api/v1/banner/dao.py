@@ -1,275 +1,548 @@
 from datetime import datetime
 from logging import getLogger
-from typing import Iterable
+from typing import AsyncIterator, Iterable
 
-from sqlalchemy import delete, func, select
+from sqlalchemy import (
+    Row,
+    Select,
+    Table,
+    TableValuedAlias,
+    and_,
+    bindparam,
+    delete,
+    func,
+    insert,
+    literal,
+    select,
+    update,
+)
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import aliased
 
-from source.database import async_session_factory
+from source.database import autocommit_engine, timed_query
 
 from . import models, schemas
+from .records import BannerRecord, make_banner_record
 
 logger = getLogger(__name__)
 
+_tag = models.TagORM.__table__
+_feature = models.FeatureORM.__table__
+_banner = models.BannerORM.__table__
+_banner_tag = models.BannerTagORM.__table__
+_banner_feature_tag = models.BannerFeatureTagORM.__table__
+
+# built once: SQLAlchemy reuses its compiled form and asyncpg its prepared statement
+USER_BANNER_QUERY = (
+    select(_banner.c.id, _banner.c.title, _banner.c.text, _banner.c.url, _banner.c.active)
+    .select_from(_banner_feature_tag)
+    .join(_banner, _banner.c.id == _banner_feature_tag.c.banner_id)
+    .where(_banner_feature_tag.c.feature_id == bindparam("feature_id"))
+    .where(_banner_feature_tag.c.tag_id == bindparam("tag_id"))
+)
+
+
+def _feature_tag_pairs(pairs: list[tuple[int, int]]) -> TableValuedAlias:
+    """
+    (feature_id, tag_id) pairs as a table, unnest() of two array parameters,
+    so the statement does not grow with the number of pairs
+    """
+    feature_ids, tag_ids = zip(*pairs) if pairs else ((), ())
+    return (
+        func.unnest(
+            bindparam(
+                "feature_ids", list(feature_ids), type_=ARRAY(_banner_feature_tag.c.feature_id.type)
+            ),
+            bindparam("tag_ids", list(tag_ids), type_=ARRAY(_banner_feature_tag.c.tag_id.type)),
+        )
+        .table_valued("feature_id", "tag_id")
+        .render_derived()
+    )
+
 
 class BannerDAO:
     @classmethod
-    async def create_banner(cls, banner: schemas.CreateUpdateBannerSchema) -> int:
-        async with async_session_factory() as session:
-            async with session.begin():
-                banner_orm = models.BannerORM(
-                    title=banner.content.title,
-                    text=banner.content.text,
-                    url=banner.content.url,
-                    active=banner.active,
-                    feature_id=banner.feature_id,
-                )
-                session.add(banner_orm)
-                await session.flush()
-                return banner_orm.id
+    @timed_query
+    async def create_banner(
+        cls, session: AsyncSession, banner: schemas.CreateUpdateBannerSchema
+    ) -> int:
+        """
+        Raises IntegrityError if a (feature_id, tag_id) pair already belongs to another banner
+        """
+        banner_orm = models.BannerORM(
+            title=banner.content.title,
+            text=banner.content.text,
+            url=banner.content.url,
+            active=banner.active,
+            feature_id=banner.feature_id,
+        )
+        session.add(banner_orm)
+        await session.flush()
+        cls._add_banner_relations(session, banner_orm.id, banner.feature_id, banner.tag_ids)
+        await session.flush()
+        return banner_orm.id
 
     @classmethod
-    async def get_banner_by_id(cls, banner_id: int) -> models.BannerORM | None:
-        async with async_session_factory() as session:
-            async with session.begin():
-                banner_orm = await session.execute(
-                    select(models.BannerORM).filter(models.BannerORM.id == banner_id)
-                )
-                banner_orm = banner_orm.scalar_one_or_none()
-                if not banner_orm:
-                    return None
-                session.expunge(banner_orm)
-                return banner_orm
+    @timed_query
+    async def create_banners(
+        cls, session: AsyncSession, banners: list[schemas.CreateUpdateBannerSchema]
+    ) -> list[int]:
+        """
+        Inserts all banners and their relations with multi-row inserts,
+        returns banner ids in the order of `banners`.
+        Raises IntegrityError if a (feature_id, tag_id) pair already belongs to another banner
+        """
+        result = await session.execute(
+            insert(_banner).returning(_banner.c.id, sort_by_parameter_order=True),
+            [
+                {
+                    "title": banner.content.title,
+                    "text": banner.content.text,
+                    "url": banner.content.url,
+                    "active": banner.active,
+                    "feature_id": banner.feature_id,
+                }
+                for banner in banners
+            ],
+        )
+        banner_ids = list(result.scalars())
+        relations = [
+            {"banner_id": banner_id, "feature_id": banner.feature_id, "tag_id": tag_id}
+            for banner_id, banner in zip(banner_ids, banners)
+            for tag_id in banner.tag_ids
+        ]
+        await session.execute(
+            insert(_banner_tag),
+            [{"banner_id": row["banner_id"], "tag_id": row["tag_id"]} for row in relations],
+        )
+        await session.execute(insert(_banner_feature_tag), relations)
+        return banner_ids
+
+    @classmethod
+    @timed_query
+    async def get_banner_by_id(
+        cls, session: AsyncSession, banner_id: int
+    ) -> models.BannerORM | None:
+        banner_orm = await session.execute(
+            select(models.BannerORM).filter(models.BannerORM.id == banner_id)
+        )
+        return banner_orm.scalar_one_or_none()
+
+    @classmethod
+    @timed_query
+    async def get_banner_tags(cls, session: AsyncSession, banner_id: int) -> list[int]:
+        bt = aliased(models.BannerTagORM)
+        query = select(bt.tag_id).filter(bt.banner_id == banner_id)
+        result = await session.execute(query)
+        return list(result.scalars())
 
     @classmethod
-    async def get_banner_tags(cls, banner_id: int) -> list[int]:
-        async with async_session_factory() as session:
-            async with session.begin():
-                bt = aliased(models.BannerTagORM)
-                query = select(bt.tag_id).filter(bt.banner_id == banner_id)
-                result = await session.execute(query)
-                tag_ids = result.scalars().all()
-                if not tag_ids:
-                    return []
-                session.expunge_all()
-                return tag_ids
+    def _banners_full_info_query(
+        cls, tag_id: int | None, feature_id: int | None, after_banner_id: int | None = None
+    ) -> Select:
+        """
+        Banners in the GET /banner response shape ordered by id, one row per banner,
+        tag_ids are collected by the database from the banner_tag primary key index
+        """
+        b = aliased(models.BannerORM)
+        bt = aliased(models.BannerTagORM)
+        bt_filter = aliased(models.BannerTagORM)
+
+        tag_ids = select(bt.tag_id).filter(bt.banner_id == b.id).order_by(bt.tag_id)
+        return (
+            select(
+                b.id,
+                b.title,
+                b.text,
+                b.url,
+                b.active,
+                b.created_at,
+                b.updated_at,
+                b.feature_id,
+                func.array(tag_ids.scalar_subquery()),
+            )
+            .filter(b.id > after_banner_id if after_banner_id is not None else True)
+            .filter(b.feature_id == feature_id if feature_id else True)
+            .filter(
+                b.id.in_(select(bt_filter.banner_id).filter(bt_filter.tag_id == tag_id))
+                if tag_id
+                else True
+            )
+            .order_by(b.id)
+        )
 
     @classmethod
+    def _to_full_info(cls, row: Row) -> dict[str, str | int | bool | datetime | dict | list]:
+        banner_id, title, text, url, active, created_at, updated_at, feature_id, tag_ids = row
+        # same key order as schemas.BannerFullInfoSchema
+        return {
+            "tag_ids": tag_ids,
+            "feature_id": feature_id,
+            "content": {"title": title, "text": text, "url": url},
+            "is_active": active,
+            "banner_id": banner_id,
+            "created_at": created_at,
+            "updated_at": updated_at,
+        }
+
+    @classmethod
+    @timed_query
     async def get_banners(
-        cls, tag_id: int | None, feature_id: int | None, limit: int, offset: int
-    ) -> list[dict[str, str | int | bool | datetime]] | None:
-        async with async_session_factory() as session:
-            async with session.begin():
-                b = aliased(models.BannerORM)
-                bt = aliased(models.BannerTagORM)
-
-                query = (
-                    select(b, bt)
-                    .join(bt, b.id == bt.banner_id)
-                    .filter(b.feature_id == feature_id if feature_id else True)
-                    .filter(bt.tag_id == tag_id if tag_id else True)
-                    .limit(limit)
-                    .offset(offset)
-                )
+        cls,
+        session: AsyncSession,
+        tag_id: int | None,
+        feature_id: int | None,
+        limit: int,
+        offset: int,
+        after_banner_id: int | None = None,
+    ) -> list[dict[str, str | int | bool | datetime | dict | list]]:
+        """
+        Returns a page of banners in the GET /banner response shape, LIMIT/OFFSET apply
+        to banners (not to banner-tag rows).
+        With `after_banner_id` the page starts right after that banner (keyset pagination
+        over the primary key index)
+        """
+        query = (
+            cls._banners_full_info_query(tag_id, feature_id, after_banner_id)
+            .limit(limit)
+            .offset(offset)
+        )
 
-                unsorted_data = await session.execute(query)
-                unsorted_data = unsorted_data.all()
-                if not unsorted_data:
-                    return None
-                sorted_data = []
-
-                for banner, banner_tag in unsorted_data:
-                    for sorted_banner in sorted_data:
-                        if sorted_banner["id"] == banner_tag.banner_id:
-                            sorted_banner["tag_ids"].append(banner_tag.tag_id)
-                            break
-                    else:
-                        sorted_data.append(
-                            {
-                                "id": banner.id,
-                                "title": banner.title,
-                                "text": banner.text,
-                                "url": banner.url,
-                                "active": banner.active,
-                                "created_at": banner.created_at,
-                                "updated_at": banner.updated_at,
-                                "tag_ids": [banner_tag.tag_id],
-                                "feature_id": banner.feature_id,
-                            }
-                        )
-                return sorted_data
+        result = await session.execute(query)
+        return [cls._to_full_info(row) for row in result.all()]
 
     @classmethod
-    async def get_banner_by_tag_and_feature(
+    async def stream_banners(
+        cls, session: AsyncSession, tag_id: int | None, feature_id: int | None, batch_size: int
+    ) -> AsyncIterator[list[dict[str, str | int | bool | datetime | dict | list]]]:
+        """
+        Yields every matching banner in the GET /banner response shape in batches,
+        read from a server-side cursor
+        """
+        query = cls._banners_full_info_query(tag_id, feature_id).execution_options(
+            yield_per=batch_size
+        )
+
+        result = await session.stream(query)
+        async for partition in result.partitions():
+            yield [cls._to_full_info(row) for row in partition]
+
+    @classmethod
+    @timed_query
+    async def get_banner_record_by_tag_and_feature(
         cls, feature_id: int, tag_id: int
-    ) -> models.BannerORM | None:
-        async with async_session_factory() as session:
-            async with session.begin():
-                b = aliased(models.BannerORM)
-                bt = aliased(models.BannerTagORM)
-
-                query = (
-                    select(b)
-                    .join(bt, b.id == bt.banner_id)
-                    .filter(b.feature_id == feature_id)
-                    .filter(bt.tag_id == tag_id)
-                )
+    ) -> BannerRecord | None:
+        """
+        Hot path of GET /user_banner: no session, no ORM objects, one prepared statement
+        """
+        async with autocommit_engine.connect() as connection:
+            result = await connection.execute(
+                USER_BANNER_QUERY, {"feature_id": feature_id, "tag_id": tag_id}
+            )
+            row = result.first()
+        return make_banner_record(*row) if row else None
 
-                banner_orm = await session.execute(query)
-                banner_orm = banner_orm.scalar_one_or_none()
-                if not banner_orm:
-                    return None
-                session.expunge(banner_orm)
+    @classmethod
+    @timed_query
+    async def get_banner_records_by_tags_and_features(
+        cls, pairs: list[tuple[int, int]]
+    ) -> dict[tuple[int, int], BannerRecord]:
+        """
+        Batch counterpart of get_banner_record_by_tag_and_feature: one query for all pairs,
+        returns {(feature_id, tag_id): banner} of the found ones
+        """
+        wanted = _feature_tag_pairs(pairs)
+        query = (
+            select(
+                _banner_feature_tag.c.feature_id,
+                _banner_feature_tag.c.tag_id,
+                _banner.c.id,
+                _banner.c.title,
+                _banner.c.text,
+                _banner.c.url,
+                _banner.c.active,
+            )
+            .select_from(wanted)
+            .join(
+                _banner_feature_tag,
+                and_(
+                    _banner_feature_tag.c.feature_id == wanted.c.feature_id,
+                    _banner_feature_tag.c.tag_id == wanted.c.tag_id,
+                ),
+            )
+            .join(_banner, _banner.c.id == _banner_feature_tag.c.banner_id)
+        )
+        async with autocommit_engine.connect() as connection:
+            result = await connection.execute(query)
+            rows = result.all()
+        return {
+            (feature_id, tag_id): make_banner_record(*content)
+            for feature_id, tag_id, *content in rows
+        }
 
-                return banner_orm
+    @classmethod
+    @timed_query
+    async def get_feature_active_banners(cls, feature_id: int) -> list[tuple[int, str, str, str]]:
+        """
+        Returns (tag_id, title, text, url) of every active banner of the feature, by tag
+        """
+        query = (
+            select(_banner_feature_tag.c.tag_id, _banner.c.title, _banner.c.text, _banner.c.url)
+            .select_from(_banner_feature_tag)
+            .join(_banner, _banner.c.id == _banner_feature_tag.c.banner_id)
+            .where(_banner_feature_tag.c.feature_id == feature_id)
+            .where(_banner.c.active)
+            .order_by(_banner_feature_tag.c.tag_id)
+        )
+        async with autocommit_engine.connect() as connection:
+            result = await connection.execute(query)
+            return [tuple(row) for row in result.all()]
 
     @classmethod
-    async def update_banner(cls, banner_id: int, banner: schemas.CreateUpdateBannerSchema) -> None:
-        async with async_session_factory() as session:
-            async with session.begin():
-                banner_orm = await session.get(models.BannerORM, banner_id)
-                banner_orm.title = banner.content.title
-                banner_orm.text = banner.content.text
-                banner_orm.url = banner.content.url
-                banner_orm.active = banner.active
-                banner_orm.feature_id = banner.feature_id
-                await session.flush()
-                return
+    @timed_query
+    async def get_banner_conflicts(
+        cls,
+        session: AsyncSession,
+        feature_id: int,
+        tag_ids: Iterable[int],
+        exclude_banner_id: int | None = None,
+    ) -> list[tuple[int, int]]:
+        """
+        Returns (banner_id, tag_id) of relations which already take the given feature and tags
+        """
+        bft = aliased(models.BannerFeatureTagORM)
+        query = (
+            select(bft.banner_id, bft.tag_id)
+            .filter(bft.feature_id == feature_id)
+            .filter(bft.tag_id.in_(tag_ids))
+            .filter(bft.banner_id != exclude_banner_id if exclude_banner_id else True)
+        )
+        result = await session.execute(query)
+        return [tuple(row) for row in result.all()]
 
     @classmethod
-    async def delete_banner(cls, banner_orm: models.BannerORM) -> None:
-        async with async_session_factory() as session:
-            async with session.begin():
-                await session.delete(banner_orm)
-                await session.flush()
-                return
+    @timed_query
+    async def get_banner_ids_by_feature_and_tag(
+        cls, session: AsyncSession, pairs: list[tuple[int, int]]
+    ) -> dict[tuple[int, int], int]:
+        """
+        Returns {(feature_id, tag_id): banner_id} of the given pairs which are already taken,
+        in one query regardless of the number of pairs
+        """
+        bft = aliased(models.BannerFeatureTagORM)
+        wanted = _feature_tag_pairs(pairs)
+        query = select(bft.feature_id, bft.tag_id, bft.banner_id).join(
+            wanted,
+            and_(bft.feature_id == wanted.c.feature_id, bft.tag_id == wanted.c.tag_id),
+        )
+        result = await session.execute(query)
+        return {(feature_id, tag_id): banner_id for feature_id, tag_id, banner_id in result}
 
     @classmethod
-    async def delete_banners_by_feat_or_tag_id(
-        cls, feature_id: int | None, tag_id: int | None
-    ) -> None:
-        async with async_session_factory() as session:
-            async with session.begin():
-                b = aliased(models.BannerORM)
-                bt = aliased(models.BannerTagORM)
-
-                query = (
-                    select(b)
-                    .join(bt, b.id == bt.banner_id)
-                    .filter(b.feature_id == feature_id if feature_id else True)
-                    .filter(bt.tag_id == tag_id if tag_id else True)
-                )
+    async def stream_banner_mappings(
+        cls, session: AsyncSession, batch_size: int
+    ) -> AsyncIterator[list[tuple[int, int, BannerRecord]]]:
+        """
+        Yields (feature_id, tag_id, banner) of every banner-tag relation in batches,
+        read from a server-side cursor
+        """
+        b = aliased(models.BannerORM)
+        bft = aliased(models.BannerFeatureTagORM)
+
+        query = (
+            select(bft.feature_id, bft.tag_id, b.id, b.title, b.text, b.url, b.active)
+            .join(b, b.id == bft.banner_id)
+            .execution_options(yield_per=batch_size)
+        )
 
-                res = await session.execute(query)
-                banners = res.scalars().all()
-                for banner in banners:
-                    await session.delete(banner)
-                await session.flush()
-                return
+        result = await session.stream(query)
+        async for partition in result.partitions():
+            yield [
+                (feature_id, tag_id, make_banner_record(*content))
+                for feature_id, tag_id, *content in partition
+            ]
 
     @classmethod
-    async def create_tag(cls, tag_name: str = "some_tag_name") -> models.TagORM:
-        async with async_session_factory() as session:
-            async with session.begin():
-                tag_orm = models.TagORM(
-                    name=tag_name,
-                )
-                session.add(tag_orm)
-                await session.flush()
-                return tag_orm.id
+    @timed_query
+    async def update_banner(
+        cls, session: AsyncSession, banner_id: int, banner: schemas.CreateUpdateBannerSchema
+    ) -> tuple[set[tuple[int, int]], set[tuple[int, int]]] | None:
+        """
+        Locks the banner, updates the content and only the changed tag relations,
+        returns (added, removed) (feature_id, tag_id) keys, None if there is no such banner.
+        Raises IntegrityError if a (feature_id, tag_id) pair already belongs to another banner
+        """
+        result = await session.execute(
+            select(_banner.c.feature_id).where(_banner.c.id == banner_id).with_for_update()
+        )
+        old_feature_id = result.scalar_one_or_none()
+        if old_feature_id is None:
+            return None
+        await session.execute(
+            update(_banner)
+            .where(_banner.c.id == banner_id)
+            .values(
+                title=banner.content.title,
+                text=banner.content.text,
+                url=banner.content.url,
+                active=banner.active,
+                feature_id=banner.feature_id,
+            )
+        )
+        result = await session.execute(
+            select(_banner_tag.c.tag_id).where(_banner_tag.c.banner_id == banner_id)
+        )
+        old_tag_ids = set(result.scalars())
+        new_tag_ids = set(banner.tag_ids)
+        removed_tag_ids = old_tag_ids - new_tag_ids
+        added_tag_ids = new_tag_ids - old_tag_ids
+
+        if removed_tag_ids:
+            await session.execute(
+                delete(_banner_tag)
+                .where(_banner_tag.c.banner_id == banner_id)
+                .where(_banner_tag.c.tag_id.in_(removed_tag_ids))
+            )
+            await session.execute(
+                delete(_banner_feature_tag)
+                .where(_banner_feature_tag.c.banner_id == banner_id)
+                .where(_banner_feature_tag.c.tag_id.in_(removed_tag_ids))
+            )
+        if old_feature_id != banner.feature_id and old_tag_ids & new_tag_ids:
+            await session.execute(
+                update(_banner_feature_tag)
+                .where(_banner_feature_tag.c.banner_id == banner_id)
+                .values(feature_id=banner.feature_id)
+            )
+        if added_tag_ids:
+            cls._add_banner_relations(session, banner_id, banner.feature_id, added_tag_ids)
+            await session.flush()
+
+        old_keys = {(old_feature_id, tag_id) for tag_id in old_tag_ids}
+        new_keys = {(banner.feature_id, tag_id) for tag_id in new_tag_ids}
+        return new_keys - old_keys, old_keys - new_keys
 
     @classmethod
-    async def get_tag_by_id(cls, tag_id: int) -> models.TagORM | None:
-        async with async_session_factory() as session:
-            async with session.begin():
-                tag_orm = await session.execute(
-                    select(models.TagORM).filter(models.TagORM.id == tag_id)
-                )
-                return tag_orm.scalar_one_or_none()
+    @timed_query
+    async def delete_banner(cls, session: AsyncSession, banner_orm: models.BannerORM) -> None:
+        await session.delete(banner_orm)
+        await session.flush()
+        return
 
     @classmethod
-    async def create_tag_with_id(cls, tag_id: int) -> int:
-        async with async_session_factory() as session:
-            async with session.begin():
-                current_tag_max_id = await cls._get_current_tag_max_id()
-                if tag_id <= current_tag_max_id:
-                    raise ValueError(f"Tag id {tag_id} already exists")
-                tags = [
-                    models.TagORM(name="some_tag_name") for _ in range(tag_id - current_tag_max_id)
-                ]
-                session.add_all(tags)
-                await session.flush()
-                return tags[-1].id
+    def _delete_banners_query(
+        cls,
+        feature_id: int | None,
+        tag_id: int | None,
+        limit: int | None = None,
+        skip_locked: bool = False,
+    ) -> Select:
+        """
+        One DELETE ... RETURNING statement, relations go away by ON DELETE CASCADE and are
+        read from the snapshot the statement started with.
+        With `limit` at most that many banners are deleted, in id order
+        """
+        b = _banner.alias()
+        matching = select(b.c.id)
+        if feature_id:
+            matching = matching.where(b.c.feature_id == feature_id)
+        if tag_id:
+            matching = matching.where(
+                b.c.id.in_(select(_banner_tag.c.banner_id).where(_banner_tag.c.tag_id == tag_id))
+            )
+        if limit is not None:
+            matching = (
+                matching.order_by(b.c.id).limit(limit).with_for_update(skip_locked=skip_locked)
+            )
+        deleted = (
+            delete(_banner)
+            .where(_banner.c.id.in_(matching.scalar_subquery()))
+            .returning(_banner.c.id, _banner.c.feature_id)
+            .cte("deleted")
+        )
+        return select(deleted.c.id, deleted.c.feature_id, _banner_tag.c.tag_id).join(
+            _banner_tag, _banner_tag.c.banner_id == deleted.c.id
+        )
 
     @classmethod
-    async def _get_current_tag_max_id(cls) -> int:
-        async with async_session_factory() as session:
-            async with session.begin():
-                tag_max_id = await session.execute(select(func.max(models.TagORM.id)))
-                return tag_max_id.scalar() or 0
+    @timed_query
+    async def delete_banners_by_feat_or_tag_id(
+        cls, session: AsyncSession, feature_id: int | None, tag_id: int | None
+    ) -> list[tuple[int, int, int]]:
+        """
+        Returns (banner_id, feature_id, tag_id) of every deleted banner-tag relation
+        """
+        result = await session.execute(cls._delete_banners_query(feature_id, tag_id))
+        return [tuple(row) for row in result.all()]
 
     @classmethod
-    async def get_feature_by_id(cls, feature_id: int) -> models.FeatureORM | None:
-        async with async_session_factory() as session:
-            async with session.begin():
-                feature_orm = await session.execute(
-                    select(models.FeatureORM).filter(models.FeatureORM.id == feature_id)
-                )
-                return feature_orm.scalar_one_or_none()
+    @timed_query
+    async def delete_banners_batch_by_feat_or_tag_id(
+        cls,
+        session: AsyncSession,
+        feature_id: int | None,
+        tag_id: int | None,
+        batch_size: int,
+        skip_locked: bool,
+    ) -> list[tuple[int, int, int]]:
+        """
+        Deletes up to `batch_size` matching banners,
+        returns (banner_id, feature_id, tag_id) of every deleted banner-tag relation.
+        With `skip_locked` banners locked by other transactions are left for a later batch
+        """
+        result = await session.execute(
+            cls._delete_banners_query(feature_id, tag_id, batch_size, skip_locked)
+        )
+        return [tuple(row) for row in result.all()]
 
     @classmethod
-    async def _get_current_feature_max_id(cls) -> int:
-        async with async_session_factory() as session:
-            async with session.begin():
-                feature_max_id = await session.execute(select(func.max(models.FeatureORM.id)))
-                return feature_max_id.scalar() or 0
+    @timed_query
+    async def create_tags_if_not_exist(cls, session: AsyncSession, tag_ids: Iterable[int]) -> None:
+        await cls._create_rows_if_not_exist(session, _tag, tag_ids, name="some_tag_name")
 
     @classmethod
-    async def create_feature_with_id(cls, feature_id: int) -> models.FeatureORM:
-        async with async_session_factory() as session:
-            async with session.begin():
-                current_feature_max_id = await cls._get_current_feature_max_id()
-                if feature_id <= current_feature_max_id:
-                    raise ValueError(f"Feature id {feature_id} already exists")
-                features = [
-                    models.FeatureORM(name="some_feature_name")
-                    for _ in range(feature_id - current_feature_max_id)
-                ]
-                session.add_all(features)
-                await session.flush()
-                return features[-1]
+    @timed_query
+    async def create_features_if_not_exist(
+        cls, session: AsyncSession, feature_ids: Iterable[int]
+    ) -> None:
+        await cls._create_rows_if_not_exist(
+            session, _feature, feature_ids, name="some_feature_name"
+        )
 
     @classmethod
-    async def create_relation_banner_tag(cls, banner_id: int, tag_id: int | Iterable[int]) -> None:
-        async with async_session_factory() as session:
-            async with session.begin():
-                if isinstance(tag_id, Iterable):
-                    for tag_id_ in tag_id:
-                        relation_banner_feature_orm = models.BannerTagORM(
-                            banner_id=banner_id,
-                            tag_id=tag_id_,
-                        )
-                        session.add(relation_banner_feature_orm)
-                else:
-                    relation_banner_feature_orm = models.BannerTagORM(
-                        banner_id=banner_id,
-                        tag_id=tag_id,
-                    )
-                    session.add(relation_banner_feature_orm)
-                await session.flush()
-                return
+    async def _create_rows_if_not_exist(
+        cls, session: AsyncSession, table: Table, ids: Iterable[int], name: str
+    ) -> None:
+        """
+        One INSERT ... SELECT FROM unnest(ids) ON CONFLICT DO NOTHING over exactly the given ids.
+        Concurrent callers wait on each other's uncommitted rows instead of failing, ids are
+        sorted so that they always take row locks in the same order
+        """
+        new_ids = (
+            func.unnest(bindparam("ids", sorted(set(ids)), type_=ARRAY(table.c.id.type)))
+            .table_valued("id")
+            .render_derived()
+        )
+        query = (
+            pg_insert(table)
+            .from_select(
+                ["id", "name", "created_at", "updated_at"],
+                select(new_ids.c.id, literal(name), func.now(), func.now()),
+            )
+            .on_conflict_do_nothing(index_elements=[table.c.id])
+        )
+        await session.execute(query)
 
     @classmethod
-    async def update_relation_banner_tag(
-        cls,
-        banner_id: int,
-        tag_id: int | Iterable[int],
+    def _add_banner_relations(
+        cls, session: AsyncSession, banner_id: int, feature_id: int, tag_ids: Iterable[int]
     ) -> None:
-        async with async_session_factory() as session:
-            async with session.begin():
-                await session.execute(
-                    delete(models.BannerTagORM).filter(models.BannerTagORM.banner_id == banner_id)
+        for tag_id in tag_ids:
+            session.add(models.BannerTagORM(banner_id=banner_id, tag_id=tag_id))
+            session.add(
+                models.BannerFeatureTagORM(
+                    feature_id=feature_id, tag_id=tag_id, banner_id=banner_id
                 )
-                await session.flush()
-                await cls.create_relation_banner_tag(banner_id, tag_id)
-                return
+            )
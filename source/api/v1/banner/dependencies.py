@@ -1,19 +1,23 @@
 import logging
 from typing import Annotated, Literal
 
-from fastapi import Header
+from fastapi import Depends, Header, Request
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from source.api.v1.set_header.constants import ADMIN_TOKEN
+from source.database import get_session
 
 from . import models, schemas
 from .dao import BannerDAO
 from .exceptions import (
     ErrorBannerNotFound,
+    ErrorCursorAndOffsetProvided,
+    ErrorInvalidCursor,
     ErrorUserHaveNoAccess,
     ErrorUserNotAuthorized,
     ErrorValueMustBeGTEZero,
-    ErrorTagAndFeatureRelationAlreadyExist,
 )
+from .pagination import decode_cursor
 
 logger = logging.getLogger(__name__)
 
@@ -33,23 +37,38 @@ def check_user_authorized(token: Annotated[str | None, Header()] = None):
         raise ErrorUserNotAuthorized
 
 
-async def add_tags_if_not_exist(banner: schemas.CreateUpdateBannerSchema):
-    tag_max_id = max(banner.tag_ids)
-    try:
-        await BannerDAO.create_tag_with_id(tag_max_id)
-    except ValueError as e:
-        logger.info(f"{e.__class__.__name__}: {e}")
+async def add_tags_if_not_exist(
+    banner: schemas.CreateUpdateBannerSchema, session: AsyncSession = Depends(get_session)
+):
+    await BannerDAO.create_tags_if_not_exist(session, banner.tag_ids)
 
 
-async def add_feature_if_not_exist(banner: schemas.CreateUpdateBannerSchema):
-    try:
-        await BannerDAO.create_feature_with_id(banner.feature_id)
-    except ValueError as e:
-        logger.info(f"{e.__class__.__name__}: {e}")
+async def add_feature_if_not_exist(
+    banner: schemas.CreateUpdateBannerSchema, session: AsyncSession = Depends(get_session)
+):
+    await BannerDAO.create_features_if_not_exist(session, [banner.feature_id])
+
+
+async def add_bulk_tags_if_not_exist(
+    bulk: schemas.BannerBulkCreateSchema, session: AsyncSession = Depends(get_session)
+):
+    await BannerDAO.create_tags_if_not_exist(
+        session, (tag_id for banner in bulk.banners for tag_id in banner.tag_ids)
+    )
+
+
+async def add_bulk_features_if_not_exist(
+    bulk: schemas.BannerBulkCreateSchema, session: AsyncSession = Depends(get_session)
+):
+    await BannerDAO.create_features_if_not_exist(
+        session, (banner.feature_id for banner in bulk.banners)
+    )
 
 
-async def get_banner_by_id(id: int) -> models.BannerORM:
-    banner_orm = await BannerDAO.get_banner_by_id(banner_id=id)
+async def get_banner_by_id(
+    id: int, session: AsyncSession = Depends(get_session)
+) -> models.BannerORM:
+    banner_orm = await BannerDAO.get_banner_by_id(session, banner_id=id)
     if not banner_orm:
         raise ErrorBannerNotFound(banner_id=id)
     return banner_orm
@@ -76,16 +95,13 @@ def check_limit_gt_zero(limit: int = 10) -> int:
     return limit
 
 
-async def check_feat_and_tag_ids_not_violate_rules(
-    banner: schemas.CreateUpdateBannerSchema,
-):
-    for tag_id in banner.tag_ids:
-        if db_banner := await BannerDAO.get_banner_by_tag_and_feature(
-            feature_id=banner.feature_id, tag_id=tag_id
-        ):
-            tags_db = await BannerDAO.get_banner_tags(db_banner.id)
-            # find all tags that that exist in banner.tag_ids and in tags_db
-            common_tags = set(banner.tag_ids).intersection(tags_db)
-            raise ErrorTagAndFeatureRelationAlreadyExist(
-                feature_id=banner.feature_id, tag_id=common_tags, banner_id=db_banner.id
-            )
+def get_cursor_banner_id(request: Request, cursor: str | None = None) -> int | None:
+    if cursor is None:
+        return None
+    # offset defaults to 0, only the query string tells whether it was passed
+    if "offset" in request.query_params:
+        raise ErrorCursorAndOffsetProvided
+    try:
+        return decode_cursor(cursor)
+    except ValueError:
+        raise ErrorInvalidCursor(cursor=cursor)
@@ -75,3 +75,21 @@ class ErrorNoFeatureOrTagIdProvided(HTTPException):
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=detail,
         )
+
+
+class ErrorInvalidCursor(HTTPException):
+    def __init__(self, cursor: str):
+        detail = f"Некорректный курсор пагинации: {cursor}"
+        super().__init__(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=detail,
+        )
+
+
+class ErrorCursorAndOffsetProvided(HTTPException):
+    def __init__(self):
+        detail = "Параметры cursor и offset не могут быть переданы одновременно"
+        super().__init__(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=detail,
+        )
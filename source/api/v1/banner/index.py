@@ -0,0 +1,126 @@
+import asyncio
+import time
+from logging import getLogger
+from typing import Awaitable, Callable, Iterable
+
+from config import configuration as cfg
+from source.cache import CacheStats
+from source.database import async_session_factory
+
+from .dao import BannerDAO
+from .records import BannerRecord
+
+logger = getLogger(__name__)
+
+BannerKey = tuple[int, int]
+BannerMappings = list[tuple[int, int, BannerRecord]]
+
+
+class BannerIndex:
+    """
+    In-process index (feature_id, tag_id) -> banner content.
+
+    The index is fully loaded on startup, updated in place on every write made by this
+    worker and periodically reloaded to pick up writes made by other workers.
+    """
+
+    def __init__(self):
+        self._banners: dict[BannerKey, BannerRecord] = {}
+        self._keys_by_banner: dict[int, set[BannerKey]] = {}
+        # updates applied while a reload is in progress, replayed on top of the fresh data
+        self._journal: list[Callable[[], None]] | None = None
+        self._refresh_task: asyncio.Task | None = None
+        self.is_loaded = False
+        self.loaded_at: float | None = None
+        self.stats = CacheStats()
+
+    def __len__(self) -> int:
+        return len(self._banners)
+
+    def get(self, feature_id: int, tag_id: int) -> BannerRecord | None:
+        banner = self._banners.get((feature_id, tag_id))
+        if banner is None:
+            self.stats.misses += 1
+        else:
+            self.stats.hits += 1
+        return banner
+
+    async def load(
+        self, on_batch: Callable[[BannerMappings], Awaitable[None]] | None = None
+    ) -> None:
+        """
+        Reloads the whole index with one streamed query,
+        `on_batch` is awaited with every batch of loaded mappings
+        """
+        self._journal = []
+        try:
+            banners: dict[BannerKey, BannerRecord] = {}
+            keys_by_banner: dict[int, set[BannerKey]] = {}
+            async with async_session_factory() as session:
+                async with session.begin():
+                    async for batch in BannerDAO.stream_banner_mappings(
+                        session, cfg.BANNER_INDEX_LOAD_BATCH_SIZE
+                    ):
+                        for feature_id, tag_id, record in batch:
+                            key = (feature_id, tag_id)
+                            banners[key] = record
+                            keys_by_banner.setdefault(record.banner_id, set()).add(key)
+                        if on_batch is not None:
+                            await on_batch(batch)
+            self._banners, self._keys_by_banner = banners, keys_by_banner
+            for update in self._journal:
+                update()
+        finally:
+            self._journal = None
+        self.is_loaded = True
+        self.loaded_at = time.time()
+        logger.info(f"Banner index loaded: {len(self._banners)} keys")
+
+    def upsert(self, record: BannerRecord, feature_id: int, tag_ids: Iterable[int]) -> None:
+        keys = {(feature_id, tag_id) for tag_id in tag_ids}
+        self._apply(lambda: self._upsert(record, keys))
+
+    def discard(self, banner_id: int) -> None:
+        self._apply(lambda: self._discard(banner_id))
+
+    def _apply(self, update: Callable[[], None]) -> None:
+        update()
+        if self._journal is not None:
+            self._journal.append(update)
+
+    def _upsert(self, record: BannerRecord, keys: set[BannerKey]) -> None:
+        self._discard(record.banner_id)
+        for key in keys:
+            self._banners[key] = record
+        self._keys_by_banner[record.banner_id] = keys
+
+    def _discard(self, banner_id: int) -> None:
+        for key in self._keys_by_banner.pop(banner_id, ()):
+            record = self._banners.get(key)
+            if record is not None and record.banner_id == banner_id:
+                del self._banners[key]
+
+    def start_refreshing(self, interval: float) -> None:
+        if self._refresh_task is None:
+            self._refresh_task = asyncio.create_task(self._refresh_forever(interval))
+
+    async def stop_refreshing(self) -> None:
+        if self._refresh_task is None:
+            return
+        self._refresh_task.cancel()
+        try:
+            await self._refresh_task
+        except asyncio.CancelledError:
+            pass
+        self._refresh_task = None
+
+    async def _refresh_forever(self, interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.load()
+            except Exception as e:
+                logger.error(f"Error while refreshing banner index: {e}")
+
+
+banner_index = BannerIndex()
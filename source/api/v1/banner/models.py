@@ -1,6 +1,6 @@
 import datetime
 
-from sqlalchemy import BIGINT, Boolean, ForeignKey, String
+from sqlalchemy import BIGINT, Boolean, ForeignKey, PrimaryKeyConstraint, String
 from sqlalchemy.orm import Mapped, mapped_column
 
 from source.database import BaseORM
@@ -72,6 +72,7 @@ class BannerORM(BaseORM):
             ondelete="CASCADE",
         ),
         nullable=False,
+        index=True,
     )
     created_at: Mapped[datetime.datetime] = created_at_base_column()
     updated_at: Mapped[datetime.datetime] = updated_at_base_column()
@@ -94,6 +95,51 @@ class BannerTagORM(BaseORM):
             ondelete="CASCADE",
         ),
         primary_key=True,
+        index=True,
+    )
+    created_at: Mapped[datetime.datetime] = created_at_base_column()
+    updated_at: Mapped[datetime.datetime] = updated_at_base_column()
+
+
+class BannerFeatureTagORM(BaseORM):
+    """
+    Denormalised (feature_id, tag_id) -> banner_id lookup, kept in sync by BannerDAO.
+    The primary key enforces "feature and tag uniquely identify a banner"
+    """
+
+    __tablename__ = "banner_feature_tag"
+    __table_args__ = (
+        # covering primary key: the user banner lookup is answered by an index-only scan
+        PrimaryKeyConstraint(
+            "feature_id",
+            "tag_id",
+            name="banner_feature_tag_pkey",
+            postgresql_include=["banner_id"],
+        ),
+        BaseORM.__table_args__,
+    )
+    feature_id: Mapped[int] = mapped_column(
+        BIGINT,
+        ForeignKey(
+            FeatureORM.id,
+            ondelete="CASCADE",
+        ),
+    )
+    tag_id: Mapped[int] = mapped_column(
+        BIGINT,
+        ForeignKey(
+            TagORM.id,
+            ondelete="CASCADE",
+        ),
+    )
+    banner_id: Mapped[int] = mapped_column(
+        BIGINT,
+        ForeignKey(
+            BannerORM.id,
+            ondelete="CASCADE",
+        ),
+        nullable=False,
+        index=True,
     )
     created_at: Mapped[datetime.datetime] = created_at_base_column()
     updated_at: Mapped[datetime.datetime] = updated_at_base_column()
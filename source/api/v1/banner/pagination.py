@@ -0,0 +1,29 @@
+import base64
+import binascii
+
+import orjson
+
+# banner ids are BIGINT
+_MAX_BANNER_ID = 2**63 - 1
+
+
+def encode_cursor(banner_id: int) -> str:
+    """
+    Opaque keyset cursor: the page after it starts with banners whose id > banner_id
+    """
+    return base64.urlsafe_b64encode(orjson.dumps({"id": banner_id})).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> int:
+    """
+    Raises ValueError if the cursor was not made by `encode_cursor`
+    """
+    try:
+        data = orjson.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except (binascii.Error, orjson.JSONDecodeError) as e:
+        raise ValueError(f"Malformed cursor {cursor}") from e
+    if not isinstance(data, dict) or type(data.get("id")) is not int:
+        raise ValueError(f"Malformed cursor {cursor}")
+    if not 1 <= data["id"] <= _MAX_BANNER_ID:
+        raise ValueError(f"Banner id out of range in cursor {cursor}")
+    return data["id"]
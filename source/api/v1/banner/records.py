@@ -0,0 +1,23 @@
+from typing import NamedTuple
+
+import orjson
+
+
+class BannerRecord(NamedTuple):
+    """
+    Read-path banner: the ready GET /user_banner response body and the flag
+    needed for the visibility check, the same for admins and users
+    """
+
+    banner_id: int
+    active: bool
+    body: bytes
+
+
+def make_banner_record(
+    banner_id: int, title: str, text: str, url: str, active: bool
+) -> BannerRecord:
+    """
+    Encodes the content once, as schemas.ContentSchema would be serialized
+    """
+    return BannerRecord(banner_id, active, orjson.dumps({"title": title, "text": text, "url": url}))
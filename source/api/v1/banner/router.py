@@ -1,8 +1,15 @@
-from typing import Literal
+from typing import Annotated, Literal
 
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Depends, Header, Response, status
+from fastapi.responses import JSONResponse, StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config import configuration as cfg
+from source.api.v1.jobs.schemas import JobAcceptedSchema
+from source.database import get_session
 
 from . import dependencies, schemas, service
+from .bundle import etag_matches
 from .constants import INTERNAL_SERVER_ERROR_SWAGGER_RESPONSE
 
 router = APIRouter(tags=["Banner"])
@@ -39,7 +46,7 @@ async def get_user_banner(
     user_type: Literal["admin", "user"] = Depends(dependencies.get_user_type_by_token),
 ):
     if not use_last_revision:
-        banner = await service.get_cached_user_banner(
+        banner = await service.get_indexed_user_banner(
             tag_id=tag_id,
             feature_id=feature_id,
             user_type=user_type,
@@ -50,11 +57,99 @@ async def get_user_banner(
             feature_id=feature_id,
             user_type=user_type,
         )
-    return schemas.ContentSchema(
-        title=banner.title,
-        text=banner.text,
-        url=banner.url,
+    return Response(content=banner.body, media_type="application/json")
+
+
+@router.get(
+    "/user_banner/bundle",
+    name="Получение всех активных баннеров фичи по тегам",
+    status_code=status.HTTP_200_OK,
+    dependencies=[
+        Depends(dependencies.check_user_token_header),
+    ],
+    responses={
+        status.HTTP_200_OK: {
+            "description": "Содержимое активных баннеров фичи по идентификаторам тегов",
+            "content": {
+                "application/json": {
+                    "example": {
+                        "1": {
+                            "title": "Скидка 50% на все товары",
+                            "text": "Только до конца недели...",
+                            "url": "https://example.com/sale",
+                        }
+                    }
+                }
+            },
+        },
+        status.HTTP_304_NOT_MODIFIED: {
+            "description": "Набор баннеров не изменился с версии из заголовка If-None-Match",
+        },
+        status.HTTP_401_UNAUTHORIZED: {
+            "description": "Пользователь не авторизован",
+            "model": schemas.ErrorUserNotAuthorizedSchema,
+        },
+        status.HTTP_403_FORBIDDEN: {
+            "description": "Пользователь не имеет доступа",
+            "model": schemas.ErrorUserHaveNoAccessSchema,
+        },
+        status.HTTP_500_INTERNAL_SERVER_ERROR: INTERNAL_SERVER_ERROR_SWAGGER_RESPONSE,
+    },
+)
+async def get_feature_bundle(
+    feature_id: int,
+    if_none_match: Annotated[str | None, Header()] = None,
+):
+    """
+    Версия набора возвращается в заголовке ETag. Клиент может переиспользовать набор
+    в течение max-age из Cache-Control, а затем проверить его актуальность,
+    передав ETag в заголовке If-None-Match: если набор не изменился, ответ 304 без тела
+    """
+    bundle = await service.get_feature_bundle(feature_id)
+    headers = {
+        "ETag": bundle.etag,
+        "Cache-Control": f"private, max-age={cfg.BANNER_BUNDLE_MAX_AGE}",
+    }
+    if etag_matches(if_none_match, bundle.etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=bundle.body, media_type="application/json", headers=headers)
+
+
+@router.post(
+    "/user_banner/batch",
+    name="Получение баннеров для пользователя по нескольким парам фича-тег",
+    response_model=list[schemas.UserBannerBatchItemSchema],
+    status_code=status.HTTP_200_OK,
+    dependencies=[
+        Depends(dependencies.check_user_token_header),
+    ],
+    responses={
+        status.HTTP_401_UNAUTHORIZED: {
+            "description": "Пользователь не авторизован",
+            "model": schemas.ErrorUserNotAuthorizedSchema,
+        },
+        status.HTTP_403_FORBIDDEN: {
+            "description": "Пользователь не имеет доступа",
+            "model": schemas.ErrorUserHaveNoAccessSchema,
+        },
+        status.HTTP_500_INTERNAL_SERVER_ERROR: INTERNAL_SERVER_ERROR_SWAGGER_RESPONSE,
+    },
+)
+async def get_user_banners(
+    batch: schemas.UserBannerBatchRequestSchema,
+    use_last_revision: bool = False,
+    user_type: Literal["admin", "user"] = Depends(dependencies.get_user_type_by_token),
+):
+    """
+    Принимает список пар pairs и/или одну фичу feature_id со списком тегов tag_ids.
+    Результаты возвращаются в порядке запроса: сначала pairs, затем теги из tag_ids
+    """
+    body = await service.get_user_banners(
+        pairs=batch.get_pairs(),
+        use_last_revision=use_last_revision,
+        user_type=user_type,
     )
+    return Response(content=body, media_type="application/json")
 
 
 @router.get(
@@ -63,9 +158,25 @@ async def get_user_banner(
     status_code=status.HTTP_200_OK,
     response_model=list[schemas.BannerFullInfoSchema],
     responses={
+        status.HTTP_200_OK: {
+            "headers": {
+                "X-Next-Cursor": {
+                    "description": (
+                        "Курсор следующей страницы (только при pagination=cursor),"
+                        " отсутствует на последней странице"
+                    ),
+                    "schema": {"type": "string"},
+                },
+            },
+        },
         status.HTTP_400_BAD_REQUEST: {
-            "description": "Значение должно быть не меньше 0",
-            "model": schemas.ErrorValueMustBeGTEZeroSchema,
+            "description": (
+                "Значение должно быть не меньше 0, некорректный курсор"
+                " или курсор передан вместе со смещением"
+            ),
+            "model": schemas.ErrorValueMustBeGTEZeroSchema
+            | schemas.ErrorInvalidCursorSchema
+            | schemas.ErrorCursorAndOffsetProvidedSchema,
         },
         status.HTTP_401_UNAUTHORIZED: {
             "description": "Пользователь не авторизован",
@@ -86,16 +197,72 @@ async def get_banner(
     tag_id: int = None,
     limit: int = Depends(dependencies.check_limit_gt_zero),
     offset: int = Depends(dependencies.check_offset_gte_zero),
+    pagination: Literal["offset", "cursor"] = "offset",
+    after_banner_id: int | None = Depends(dependencies.get_cursor_banner_id),
+    session: AsyncSession = Depends(get_session),
 ):
-    banners = await service.get_banners(
+    """
+    pagination=cursor включает постраничный обход по курсору: offset игнорируется,
+    курсор следующей страницы возвращается в заголовке X-Next-Cursor
+    и передается в параметре cursor (вместе с offset не допускается).
+    Стоимость страницы не зависит от ее глубины
+    """
+    if pagination == "cursor":
+        body, next_cursor = await service.get_banners_page_after(
+            session,
+            feature_id=feature_id,
+            tag_id=tag_id,
+            limit=limit,
+            after_banner_id=after_banner_id,
+        )
+        headers = {"X-Next-Cursor": next_cursor} if next_cursor else None
+        return Response(content=body, media_type="application/json", headers=headers)
+    body = await service.get_banners(
+        session,
         feature_id=feature_id,
         tag_id=tag_id,
         limit=limit,
         offset=offset,
     )
-    if not banners:
-        return []
-    return [schemas.BannerFullInfoSchema(**banner) for banner in banners]
+    return Response(content=body, media_type="application/json")
+
+
+@router.get(
+    "/banner/export",
+    name="Потоковая выгрузка всех баннеров в формате NDJSON",
+    status_code=status.HTTP_200_OK,
+    response_class=StreamingResponse,
+    responses={
+        status.HTTP_200_OK: {
+            "description": "Баннеры, по одному JSON-документу в строке",
+            "content": {"application/x-ndjson": {}},
+        },
+        status.HTTP_401_UNAUTHORIZED: {
+            "description": "Пользователь не авторизован",
+            "model": schemas.ErrorUserNotAuthorizedSchema,
+        },
+        status.HTTP_403_FORBIDDEN: {
+            "description": "Пользователь не имеет доступа",
+            "model": schemas.ErrorUserHaveNoAccessSchema,
+        },
+        status.HTTP_500_INTERNAL_SERVER_ERROR: INTERNAL_SERVER_ERROR_SWAGGER_RESPONSE,
+    },
+    dependencies=[
+        Depends(dependencies.check_admin_token_header),
+    ],
+)
+async def export_banners(
+    feature_id: int = None,
+    tag_id: int = None,
+):
+    """
+    Каждая строка ответа имеет тот же формат, что и элемент ответа GET /banner.
+    Баннеры читаются из курсора базы данных пачками и отправляются по мере чтения
+    """
+    return StreamingResponse(
+        service.export_banners(tag_id=tag_id, feature_id=feature_id),
+        media_type="application/x-ndjson",
+    )
 
 
 @router.post(
@@ -123,7 +290,6 @@ async def get_banner(
         status.HTTP_500_INTERNAL_SERVER_ERROR: INTERNAL_SERVER_ERROR_SWAGGER_RESPONSE,
     },
     dependencies=[
-        Depends(dependencies.check_feat_and_tag_ids_not_violate_rules),
         Depends(dependencies.add_tags_if_not_exist),
         Depends(dependencies.add_feature_if_not_exist),
         Depends(dependencies.check_admin_token_header),
@@ -131,14 +297,53 @@ async def get_banner(
 )
 async def post_new_banner(
     banner: schemas.CreateUpdateBannerSchema,
+    session: AsyncSession = Depends(get_session),
 ):
     """
     Допустимо использование только с админским токеном
     """
-    banner_id = await service.create_banner(banner)
+    banner_id = await service.create_banner(session, banner)
     return schemas.BannerSuccessfullyCreatedSchema(banner_id=banner_id)
 
 
+@router.post(
+    "/banner/bulk",
+    name="Массовое создание баннеров",
+    response_model=list[schemas.BannerBulkCreateResultSchema],
+    status_code=status.HTTP_200_OK,
+    responses={
+        status.HTTP_200_OK: {
+            "description": "Результат создания каждого баннера в порядке запроса",
+            "model": list[schemas.BannerBulkCreateResultSchema],
+        },
+        status.HTTP_401_UNAUTHORIZED: {
+            "description": "Пользователь не авторизован",
+            "model": schemas.ErrorUserNotAuthorizedSchema,
+        },
+        status.HTTP_403_FORBIDDEN: {
+            "description": "Пользователь не имеет доступа",
+            "model": schemas.ErrorUserHaveNoAccessSchema,
+        },
+        status.HTTP_500_INTERNAL_SERVER_ERROR: INTERNAL_SERVER_ERROR_SWAGGER_RESPONSE,
+    },
+    dependencies=[
+        Depends(dependencies.check_admin_token_header),
+        Depends(dependencies.add_bulk_tags_if_not_exist),
+        Depends(dependencies.add_bulk_features_if_not_exist),
+    ],
+)
+async def post_new_banners(
+    bulk: schemas.BannerBulkCreateSchema,
+    session: AsyncSession = Depends(get_session),
+):
+    """
+    Допустимо использование только с админским токеном.
+    Баннеры, которые не конфликтуют с существующими и с предыдущими баннерами запроса,
+    создаются в одной транзакции, остальные возвращаются со статусом conflict
+    """
+    return await service.create_banners(session, bulk.banners)
+
+
 @router.patch(
     "/banner/{id}",
     name="Обновление содержимого баннера",
@@ -153,6 +358,10 @@ async def post_new_banner(
         status.HTTP_200_OK: {
             "description": "Баннер успешно обновлен",
         },
+        status.HTTP_400_BAD_REQUEST: {
+            "description": "Нарушение уникальности отношения фичи и тега",
+            "model": schemas.ErrorTagAndFeatureRelationAlreadyExistSchema,
+        },
         status.HTTP_401_UNAUTHORIZED: {
             "description": "Пользователь не авторизован",
             "model": schemas.ErrorUserNotAuthorizedSchema,
@@ -171,11 +380,13 @@ async def post_new_banner(
 async def patch_banner(
     banner: schemas.CreateUpdateBannerSchema,
     id: int,
+    session: AsyncSession = Depends(get_session),
 ):
     """
     Допустимо использование только с админским токеном
     """
     await service.update_banner(
+        session,
         banner_id=id,
         banner=banner,
     )
@@ -209,11 +420,12 @@ async def patch_banner(
 )
 async def delete_banner(
     banner_orm=Depends(dependencies.get_banner_by_id),
+    session: AsyncSession = Depends(get_session),
 ) -> None:
     """
     Допустимо использование только с админским токеном
     """
-    await service.delete_banner(banner_orm=banner_orm)
+    await service.delete_banner(session, banner_orm=banner_orm)
 
 
 @router.delete(
@@ -224,6 +436,10 @@ async def delete_banner(
         Depends(dependencies.check_admin_token_header),
     ],
     responses={
+        status.HTTP_202_ACCEPTED: {
+            "description": "Фоновая задача удаления баннеров запущена",
+            "model": JobAcceptedSchema,
+        },
         status.HTTP_204_NO_CONTENT: {
             "description": "Баннер(ы) успешно удален(ы)",
         },
@@ -256,11 +472,25 @@ async def delete_banner(
 async def delete_banner_by_feat_or_tag_id(
     feature_id: int = None,
     tag_id: int = None,
+    in_background: bool = False,
+    session: AsyncSession = Depends(get_session),
 ):
     """
-    Допустимо использование только с админским токеном
+    Допустимо использование только с админским токеном.
+    С in_background=true баннеры удаляются фоновой задачей небольшими пачками,
+    ответ 202 содержит идентификатор задачи для GET /jobs/{id}
     """
+    if in_background:
+        job = service.start_deleting_banners_by_feat_or_tag_id(
+            feature_id=feature_id,
+            tag_id=tag_id,
+        )
+        return JSONResponse(
+            content=JobAcceptedSchema(job_id=job.id).model_dump(),
+            status_code=status.HTTP_202_ACCEPTED,
+        )
     await service.delete_banners_by_feat_or_tag_id(
+        session,
         feature_id=feature_id,
         tag_id=tag_id,
     )
@@ -1,6 +1,9 @@
 from datetime import datetime
+from typing import Literal
 
-from pydantic import BaseModel, Field, field_validator
+from pydantic import BaseModel, Field, field_validator, model_validator
+
+from .constants import BANNER_BULK_CREATE_MAX_SIZE, USER_BANNER_BATCH_MAX_SIZE
 
 
 class ContentSchema(BaseModel):
@@ -22,6 +25,69 @@ class ContentSchema(BaseModel):
     )
 
 
+class FeatureTagSchema(BaseModel):
+    feature_id: int = Field(
+        title="Идентификатор фичи",
+        examples=[1],
+    )
+    tag_id: int = Field(
+        title="Идентификатор тега",
+        examples=[1],
+    )
+
+
+class UserBannerBatchRequestSchema(BaseModel):
+    pairs: list[FeatureTagSchema] = Field(
+        default_factory=list,
+        title="Пары фича-тег",
+        max_length=USER_BANNER_BATCH_MAX_SIZE,
+    )
+    feature_id: int | None = Field(
+        default=None,
+        title="Идентификатор фичи",
+        description="Фича, для которой запрашиваются баннеры всех тегов из tag_ids",
+        examples=[1],
+    )
+    tag_ids: list[int] = Field(
+        default_factory=list,
+        title="Идентификаторы тегов",
+        max_length=USER_BANNER_BATCH_MAX_SIZE,
+        examples=[[1, 2, 3]],
+    )
+
+    @model_validator(mode="after")
+    def check_pairs_or_feature_with_tags(self):
+        if self.tag_ids and self.feature_id is None:
+            raise ValueError("tag_ids передаются вместе с feature_id")
+        if not self.pairs and not self.tag_ids:
+            raise ValueError("нужно передать pairs или feature_id и tag_ids")
+        return self
+
+    def get_pairs(self) -> list[tuple[int, int]]:
+        return [(pair.feature_id, pair.tag_id) for pair in self.pairs] + [
+            (self.feature_id, tag_id) for tag_id in self.tag_ids
+        ]
+
+
+class UserBannerBatchItemSchema(BaseModel):
+    feature_id: int = Field(
+        title="Идентификатор фичи",
+        examples=[1],
+    )
+    tag_id: int = Field(
+        title="Идентификатор тега",
+        examples=[1],
+    )
+    status: Literal["found", "not_found", "not_active"] = Field(
+        title="Результат поиска баннера",
+        examples=["found"],
+    )
+    content: ContentSchema | None = Field(
+        default=None,
+        title="Содержимое баннера, если он найден и доступен пользователю",
+    )
+
+
 class CreateUpdateBannerSchema(BaseModel):
     tag_ids: list[int] = Field(
         title="Идентификаторы тегов",
@@ -81,6 +147,36 @@ class BannerSuccessfullyCreatedSchema(BaseModel):
     )
 
 
+class BannerBulkCreateSchema(BaseModel):
+    banners: list[CreateUpdateBannerSchema] = Field(
+        title="Создаваемые баннеры",
+        min_length=1,
+        max_length=BANNER_BULK_CREATE_MAX_SIZE,
+    )
+
+
+class BannerBulkCreateResultSchema(BaseModel):
+    index: int = Field(
+        title="Порядковый номер баннера в запросе",
+        examples=[0],
+        ge=0,
+    )
+    status: Literal["created", "conflict"] = Field(
+        title="Результат создания баннера",
+        examples=["created"],
+    )
+    banner_id: int | None = Field(
+        default=None,
+        title="Идентификатор созданного баннера",
+        examples=[1],
+    )
+    detail: str | None = Field(
+        default=None,
+        title="Причина, по которой баннер не создан",
+        examples=[None],
+    )
+
+
 class ErrorBannerNotActiveSchema(BaseModel):
     """Code: 400"""
 
@@ -161,3 +257,23 @@ class ErrorTagAndFeatureRelationAlreadyExistSchema(BaseModel):
         description="Отношение между фичей и тегом уже существует",
         examples=["Отношение между фичей и тегом уже существует"],
     )
+
+
+class ErrorInvalidCursorSchema(BaseModel):
+    """Code: 400"""
+
+    detail: str = Field(
+        title="Сообщение об ошибке",
+        description="Некорректный курсор пагинации",
+        examples=["Некорректный курсор пагинации: abc"],
+    )
+
+
+class ErrorCursorAndOffsetProvidedSchema(BaseModel):
+    """Code: 400"""
+
+    detail: str = Field(
+        title="Сообщение об ошибке",
+        description="Переданы одновременно курсор и смещение",
+        examples=["Параметры cursor и offset не могут быть переданы одновременно"],
+    )
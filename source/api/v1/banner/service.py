@@ -1,75 +1,576 @@
-from datetime import datetime
-from typing import Literal
+import asyncio
+from logging import getLogger
+from typing import AsyncIterator, Coroutine, Iterable, Literal
 
-from fastapi_cache.decorator import cache
+import orjson
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config import configuration as cfg
+from source.cache import SingleFlight
+from source.database import async_session_factory, run_after_commit
+from source.jobs import Job, job_registry
 
 from . import models, schemas
+from .bundle import FeatureBundle, make_feature_bundle
+from .cache import banner_cache, feature_bundle_cache, feature_bundle_key, user_banner_key
 from .dao import BannerDAO
-from .exceptions import ErrorBannerNotActive, ErrorBannerNotFound, ErrorNoFeatureOrTagIdProvided
+from .exceptions import (
+    ErrorBannerNotActive,
+    ErrorBannerNotFound,
+    ErrorNoFeatureOrTagIdProvided,
+    ErrorTagAndFeatureRelationAlreadyExist,
+)
+from .index import banner_index
+from .pagination import encode_cursor
+from .records import BannerRecord, make_banner_record
+
+logger = getLogger(__name__)
+
+# datetimes as "...Z" like pydantic does
+JSON_OPTIONS = orjson.OPT_UTC_Z
+# one JSON document per line
+NDJSON_OPTIONS = JSON_OPTIONS | orjson.OPT_APPEND_NEWLINE
+
+# in-flight database loads shared by concurrent readers of the same (feature_id, tag_id)
+_cached_banner_loads: SingleFlight[BannerRecord] = SingleFlight()
+_last_revision_banner_loads: SingleFlight[BannerRecord] = SingleFlight()
+_feature_bundle_loads: SingleFlight[FeatureBundle] = SingleFlight()
+# strong references to stale-while-revalidate refreshes, so they are not garbage collected
+_background_refreshes: set[asyncio.Task] = set()
+
+
+def _spawn_background(coro: Coroutine[None, None, None]) -> None:
+    task = asyncio.create_task(coro)
+    _background_refreshes.add(task)
+    task.add_done_callback(_background_refreshes.discard)
+
+
+def _make_banner_record(banner_id: int, banner: schemas.CreateUpdateBannerSchema) -> BannerRecord:
+    return make_banner_record(
+        banner_id=banner_id,
+        title=banner.content.title,
+        text=banner.content.text,
+        url=banner.content.url,
+        active=banner.active,
+    )
+
+
+async def _store_banner(banner: BannerRecord, feature_id: int, tag_ids: Iterable[int]) -> None:
+    """
+    Write-through of a created or updated banner to the index and both cache tiers
+    """
+    banner_index.upsert(banner, feature_id, tag_ids)
+    await banner_cache.set_many({user_banner_key(feature_id, tag_id): banner for tag_id in tag_ids})
+    await _evict_feature_bundles([feature_id])
+
+
+async def _store_banners(
+    banners: list[tuple[BannerRecord, schemas.CreateUpdateBannerSchema]]
+) -> None:
+    """
+    Write-through of many created banners with one cache round trip
+    """
+    for record, banner in banners:
+        banner_index.upsert(record, banner.feature_id, banner.tag_ids)
+    await banner_cache.set_many(
+        {
+            user_banner_key(banner.feature_id, tag_id): record
+            for record, banner in banners
+            for tag_id in banner.tag_ids
+        }
+    )
+    await _evict_feature_bundles({banner.feature_id for _, banner in banners})
+
+
+async def _evict_banner_keys(keys: Iterable[tuple[int, int]]) -> None:
+    keys = list(keys)
+    await banner_cache.delete(*(user_banner_key(feature_id, tag_id) for feature_id, tag_id in keys))
+    await _evict_feature_bundles({feature_id for feature_id, _ in keys})
+
 
+async def _evict_feature_bundles(feature_ids: Iterable[int]) -> None:
+    await feature_bundle_cache.delete(
+        *(feature_bundle_key(feature_id) for feature_id in feature_ids)
+    )
 
-async def create_banner(banner: schemas.CreateUpdateBannerSchema) -> int:
-    banner_id = await BannerDAO.create_banner(banner)
-    await BannerDAO.create_relation_banner_tag(banner_id, banner.tag_ids)
+
+async def warm_up() -> None:
+    """
+    Loads every (feature_id, tag_id) mapping into the index and both cache tiers
+    """
+
+    async def fill_cache(batch: list[tuple[int, int, BannerRecord]]) -> None:
+        await banner_cache.set_many(
+            {user_banner_key(feature_id, tag_id): banner for feature_id, tag_id, banner in batch}
+        )
+
+    await banner_index.load(on_batch=fill_cache)
+
+
+async def _check_feat_and_tag_ids_not_violate_rules(
+    banner: schemas.CreateUpdateBannerSchema, banner_id: int | None = None
+) -> None:
+    # called after an IntegrityError, which aborts the request transaction
+    async with async_session_factory() as session:
+        conflicts = await BannerDAO.get_banner_conflicts(
+            session, banner.feature_id, banner.tag_ids, exclude_banner_id=banner_id
+        )
+    if conflicts:
+        conflict_banner_id = conflicts[0][0]
+        raise ErrorTagAndFeatureRelationAlreadyExist(
+            feature_id=banner.feature_id,
+            tag_id={
+                tag_id for db_banner_id, tag_id in conflicts if db_banner_id == conflict_banner_id
+            },
+            banner_id=conflict_banner_id,
+        )
+
+
+async def create_banner(session: AsyncSession, banner: schemas.CreateUpdateBannerSchema) -> int:
+    try:
+        banner_id = await BannerDAO.create_banner(session, banner)
+    except IntegrityError:
+        await _check_feat_and_tag_ids_not_violate_rules(banner)
+        raise
+    banner_record = _make_banner_record(banner_id, banner)
+    run_after_commit(
+        session, lambda: _store_banner(banner_record, banner.feature_id, banner.tag_ids)
+    )
     return banner_id
 
 
-async def delete_banner(banner_orm: models.BannerORM) -> None:
-    await BannerDAO.delete_banner(banner_orm)
+async def create_banners(
+    session: AsyncSession,
+    banners: list[schemas.CreateUpdateBannerSchema],
+) -> list[schemas.BannerBulkCreateResultSchema]:
+    """
+    Creates every banner which takes no (feature_id, tag_id) pair of an existing banner
+    or of a banner earlier in the batch, the rest are reported as conflicts
+    """
+    banners = [
+        banner.model_copy(update={"tag_ids": list(dict.fromkeys(banner.tag_ids))})
+        for banner in banners
+    ]
+    try:
+        # a savepoint keeps the request transaction usable for the retry
+        async with session.begin_nested():
+            return await _create_banners(session, banners)
+    except IntegrityError:
+        # a concurrent write took one of the pairs between the check and the insert,
+        # the retry inserts banners one by one so that losing again fails only that banner
+        pass
+    return await _create_banners(session, banners, one_by_one=True)
+
+
+async def _create_banners(
+    session: AsyncSession,
+    banners: list[schemas.CreateUpdateBannerSchema],
+    one_by_one: bool = False,
+) -> list[schemas.BannerBulkCreateResultSchema]:
+    # (feature_id, tag_id) -> banner_id of the taken pairs
+    taken = await BannerDAO.get_banner_ids_by_feature_and_tag(
+        session,
+        list({(banner.feature_id, tag_id) for banner in banners for tag_id in banner.tag_ids}),
+    )
+    if one_by_one:
+        banner_ids, conflicts = await _insert_banners_one_by_one(session, banners, taken)
+    else:
+        banner_ids, conflicts = await _insert_banners_at_once(session, banners, taken)
+
+    if banner_ids:
+        created = [
+            (_make_banner_record(banner_id, banners[index]), banners[index])
+            for index, banner_id in banner_ids.items()
+        ]
+        run_after_commit(session, lambda: _store_banners(created))
+
+    results = []
+    for index, banner in enumerate(banners):
+        if index in banner_ids:
+            results.append(
+                schemas.BannerBulkCreateResultSchema(
+                    index=index, status="created", banner_id=banner_ids[index]
+                )
+            )
+            continue
+        owners = conflicts[index]
+        conflict_banner_id = next(iter(owners.values()))
+        error = ErrorTagAndFeatureRelationAlreadyExist(
+            feature_id=banner.feature_id,
+            tag_id={tag_id for tag_id, owner in owners.items() if owner == conflict_banner_id},
+            banner_id=conflict_banner_id,
+        )
+        results.append(
+            schemas.BannerBulkCreateResultSchema(
+                index=index, status="conflict", detail=error.detail
+            )
+        )
+    return results
+
+
+def _taken_tags(
+    banner: schemas.CreateUpdateBannerSchema, taken: dict[tuple[int, int], int]
+) -> dict[int, int]:
+    return {
+        tag_id: taken[pair]
+        for tag_id in banner.tag_ids
+        if (pair := (banner.feature_id, tag_id)) in taken
+    }
+
+
+async def _insert_banners_at_once(
+    session: AsyncSession,
+    banners: list[schemas.CreateUpdateBannerSchema],
+    taken: dict[tuple[int, int], int],
+) -> tuple[dict[int, int], dict[int, dict[int, int]]]:
+    """
+    Inserts the banners which take no pair with one multi-row insert, returns
+    {item index: banner_id} of the created ones and {item index: {tag_id: banner_id}}
+    of the taken pairs of the others. Raises IntegrityError if a pair was taken meanwhile
+    """
+    # pairs claimed by accepted items of this batch: (feature_id, tag_id) -> item index
+    claimed: dict[tuple[int, int], int] = {}
+    # item index -> {tag_id: (banner_id or None, item index or None)} of the taken pairs
+    conflicts: dict[int, dict[int, tuple[int | None, int | None]]] = {}
+    accepted: list[int] = []
+    for index, banner in enumerate(banners):
+        owners = {
+            tag_id: (taken.get(pair), claimed.get(pair))
+            for tag_id in banner.tag_ids
+            if (pair := (banner.feature_id, tag_id)) in taken or pair in claimed
+        }
+        if owners:
+            conflicts[index] = owners
+            continue
+        accepted.append(index)
+        claimed.update({(banner.feature_id, tag_id): index for tag_id in banner.tag_ids})
+
+    banner_ids = {}
+    if accepted:
+        created_ids = await BannerDAO.create_banners(
+            session, [banners[index] for index in accepted]
+        )
+        banner_ids = dict(zip(accepted, created_ids))
+    return banner_ids, {
+        index: {
+            tag_id: banner_id if banner_id is not None else banner_ids[item_index]
+            for tag_id, (banner_id, item_index) in owners.items()
+        }
+        for index, owners in conflicts.items()
+    }
+
+
+async def _insert_banners_one_by_one(
+    session: AsyncSession,
+    banners: list[schemas.CreateUpdateBannerSchema],
+    taken: dict[tuple[int, int], int],
+) -> tuple[dict[int, int], dict[int, dict[int, int]]]:
+    """
+    Same result as `_insert_banners_at_once`, every banner is inserted in its own savepoint:
+    a banner losing a pair to a concurrent write is reported as a conflict, not the batch
+    """
+    banner_ids: dict[int, int] = {}
+    conflicts: dict[int, dict[int, int]] = {}
+    for index, banner in enumerate(banners):
+        owners = _taken_tags(banner, taken)
+        if not owners:
+            pairs = [(banner.feature_id, tag_id) for tag_id in banner.tag_ids]
+            try:
+                async with session.begin_nested():
+                    (banner_ids[index],) = await BannerDAO.create_banners(session, [banner])
+            except IntegrityError:
+                # the concurrent write has committed by now, its pairs are visible
+                taken.update(await BannerDAO.get_banner_ids_by_feature_and_tag(session, pairs))
+                owners = _taken_tags(banner, taken)
+                if not owners:
+                    raise
+            else:
+                taken.update({pair: banner_ids[index] for pair in pairs})
+                continue
+        conflicts[index] = owners
+    return banner_ids, conflicts
+
+
+async def delete_banner(session: AsyncSession, banner_orm: models.BannerORM) -> None:
+    banner_id, feature_id = banner_orm.id, banner_orm.feature_id
+    tag_ids = await BannerDAO.get_banner_tags(session, banner_id)
+    await BannerDAO.delete_banner(session, banner_orm)
+
+    async def forget_banner() -> None:
+        banner_index.discard(banner_id)
+        await _evict_banner_keys((feature_id, tag_id) for tag_id in tag_ids)
+
+    run_after_commit(session, forget_banner)
 
 
 async def update_banner(
+    session: AsyncSession,
     banner_id: int,
     banner: schemas.CreateUpdateBannerSchema,
 ) -> None:
-    await BannerDAO.update_banner(banner_id, banner)
-    await BannerDAO.update_relation_banner_tag(banner_id, banner.tag_ids)
+    try:
+        changed_keys = await BannerDAO.update_banner(session, banner_id, banner)
+    except IntegrityError:
+        await _check_feat_and_tag_ids_not_violate_rules(banner, banner_id)
+        raise
+    if changed_keys is None:
+        raise ErrorBannerNotFound(banner_id=banner_id)
+    _, removed_keys = changed_keys
+    banner_record = _make_banner_record(banner_id, banner)
+
+    async def store_banner() -> None:
+        await _store_banner(banner_record, banner.feature_id, banner.tag_ids)
+        await _evict_banner_keys(removed_keys)
+
+    run_after_commit(session, store_banner)
+
+
+def _check_banner_visible(banner: BannerRecord, user_type: Literal["admin", "user"]) -> None:
+    if not banner.active and user_type == "user":
+        raise ErrorBannerNotActive(banner_id=banner.banner_id)
+
+
+async def _load_user_banner(feature_id: int, tag_id: int) -> BannerRecord:
+    banner = await BannerDAO.get_banner_record_by_tag_and_feature(
+        feature_id=feature_id, tag_id=tag_id
+    )
+    if not banner:
+        raise ErrorBannerNotFound(tag_id=tag_id, feature_id=feature_id)
+    return banner
+
+
+async def _load_user_banner_to_cache(feature_id: int, tag_id: int) -> BannerRecord:
+    banner = await _load_user_banner(feature_id, tag_id)
+    await banner_cache.set(user_banner_key(feature_id, tag_id), banner)
+    return banner
 
 
 async def get_user_banner(
     tag_id: int, feature_id: int, user_type: Literal["admin", "user"]
-) -> models.BannerORM:
-    banner_orm = await BannerDAO.get_banner_by_tag_and_feature(tag_id, feature_id)
-    if not banner_orm:
-        raise ErrorBannerNotFound(tag_id=tag_id, feature_id=feature_id)
-    if not banner_orm.active and user_type == "user":
-        raise ErrorBannerNotActive(banner_id=banner_orm.id)
+) -> BannerRecord:
+    banner = await _last_revision_banner_loads.do(
+        (feature_id, tag_id), lambda: _load_user_banner(feature_id, tag_id)
+    )
+    _check_banner_visible(banner, user_type)
+
+    return banner
+
+
+async def _refresh_cached_user_banner(feature_id: int, tag_id: int) -> None:
+    try:
+        await _cached_banner_loads.do(
+            (feature_id, tag_id), lambda: _load_user_banner_to_cache(feature_id, tag_id)
+        )
+    except ErrorBannerNotFound:
+        await banner_cache.delete(user_banner_key(feature_id, tag_id))
+    except Exception as e:
+        logger.error(f"Error while refreshing banner ({feature_id}, {tag_id}): {e}")
+
 
-    return banner_orm
+def _schedule_user_banner_refresh(feature_id: int, tag_id: int) -> None:
+    if (feature_id, tag_id) in _cached_banner_loads:
+        return
+    _spawn_background(_refresh_cached_user_banner(feature_id, tag_id))
 
 
-@cache(expire=300)
 async def get_cached_user_banner(
     tag_id: int, feature_id: int, user_type: Literal["admin", "user"]
-) -> models.BannerORM:
-    return await get_user_banner(tag_id, feature_id, user_type)
+) -> BannerRecord:
+    entry = await banner_cache.get_entry(user_banner_key(feature_id, tag_id))
+    if entry is None:
+        banner = await _cached_banner_loads.do(
+            (feature_id, tag_id), lambda: _load_user_banner_to_cache(feature_id, tag_id)
+        )
+    else:
+        banner = entry.value
+        if entry.is_stale:
+            _schedule_user_banner_refresh(feature_id, tag_id)
+    _check_banner_visible(banner, user_type)
+
+    return banner
+
+
+async def get_indexed_user_banner(
+    tag_id: int, feature_id: int, user_type: Literal["admin", "user"]
+) -> BannerRecord:
+    if not banner_index.is_loaded:
+        return await get_cached_user_banner(tag_id, feature_id, user_type)
+    banner = banner_index.get(feature_id, tag_id)
+    if not banner:
+        raise ErrorBannerNotFound(tag_id=tag_id, feature_id=feature_id)
+    _check_banner_visible(banner, user_type)
+
+    return banner
+
+
+async def get_user_banners(
+    pairs: list[tuple[int, int]],
+    use_last_revision: bool,
+    user_type: Literal["admin", "user"],
+) -> bytes:
+    """
+    Resolves many (feature_id, tag_id) pairs at once: from the index when it is loaded,
+    otherwise with one cache multi-get and one database query for the misses.
+    With `use_last_revision` every pair is read from the database.
+    Returns the encoded list of schemas.UserBannerBatchItemSchema
+    """
+    banners = await _find_user_banners(list(dict.fromkeys(pairs)), use_last_revision)
+    results = []
+    for feature_id, tag_id in pairs:
+        banner = banners.get((feature_id, tag_id))
+        if banner is None:
+            status, content = "not_found", None
+        elif not banner.active and user_type == "user":
+            status, content = "not_active", None
+        else:
+            status, content = "found", orjson.Fragment(banner.body)
+        results.append(
+            {"feature_id": feature_id, "tag_id": tag_id, "status": status, "content": content}
+        )
+    return orjson.dumps(results)
+
+
+async def _find_user_banners(
+    keys: list[tuple[int, int]], use_last_revision: bool
+) -> dict[tuple[int, int], BannerRecord]:
+    if not use_last_revision and banner_index.is_loaded:
+        return {key: banner for key in keys if (banner := banner_index.get(*key)) is not None}
+
+    banners = {}
+    if not use_last_revision:
+        keys_by_cache_key = {user_banner_key(*key): key for key in keys}
+        entries = await banner_cache.get_entries(list(keys_by_cache_key))
+        for cache_key, entry in entries.items():
+            key = keys_by_cache_key[cache_key]
+            banners[key] = entry.value
+            if entry.is_stale:
+                _schedule_user_banner_refresh(*key)
+
+    misses = [key for key in keys if key not in banners]
+    if misses:
+        loaded = await BannerDAO.get_banner_records_by_tags_and_features(misses)
+        if not use_last_revision and loaded:
+            await banner_cache.set_many(
+                {user_banner_key(*key): banner for key, banner in loaded.items()}
+            )
+        banners.update(loaded)
+    return banners
+
+
+async def _load_feature_bundle(feature_id: int) -> FeatureBundle:
+    bundle = make_feature_bundle(await BannerDAO.get_feature_active_banners(feature_id))
+    await feature_bundle_cache.set(feature_bundle_key(feature_id), bundle)
+    return bundle
+
+
+async def _refresh_feature_bundle(feature_id: int) -> None:
+    try:
+        await _feature_bundle_loads.do(feature_id, lambda: _load_feature_bundle(feature_id))
+    except Exception as e:
+        logger.error(f"Error while refreshing bundle of feature {feature_id}: {e}")
+
+
+async def get_feature_bundle(feature_id: int) -> FeatureBundle:
+    """
+    Tag -> content map of the active banners of the feature, pre-encoded with its ETag
+    """
+    entry = await feature_bundle_cache.get_entry(feature_bundle_key(feature_id))
+    if entry is None:
+        return await _feature_bundle_loads.do(feature_id, lambda: _load_feature_bundle(feature_id))
+    if entry.is_stale and feature_id not in _feature_bundle_loads:
+        _spawn_background(_refresh_feature_bundle(feature_id))
+    return entry.value
 
 
 async def get_banners(
-    tag_id: int | None, feature_id: int | None, limit: int, offset: int
-) -> list[dict[str, str | int | bool | datetime]]:
-    full_banners_info = await BannerDAO.get_banners(tag_id, feature_id, limit, offset)
-    if not full_banners_info:
-        return []
-    return [
-        {
-            "banner_id": banner["id"],
-            "content": {
-                "title": banner["title"],
-                "text": banner["text"],
-                "url": banner["url"],
-            },
-            "is_active": banner["active"],
-            "created_at": banner["created_at"],
-            "updated_at": banner["updated_at"],
-            "tag_ids": banner["tag_ids"],
-            "feature_id": banner["feature_id"],
-        }
-        for banner in full_banners_info
-    ]
+    session: AsyncSession, tag_id: int | None, feature_id: int | None, limit: int, offset: int
+) -> bytes:
+    """
+    Returns the encoded GET /banner page. Rows come from the database in the response
+    shape, so they are encoded as is, without pydantic models
+    """
+    banners = await BannerDAO.get_banners(session, tag_id, feature_id, limit, offset)
+    return orjson.dumps(banners, option=JSON_OPTIONS)
+
+
+async def get_banners_page_after(
+    session: AsyncSession,
+    tag_id: int | None,
+    feature_id: int | None,
+    limit: int,
+    after_banner_id: int | None,
+) -> tuple[bytes, str | None]:
+    """
+    Returns the encoded page of banners and the cursor of the next page
+    (None on the last page)
+    """
+    banners = await BannerDAO.get_banners(
+        session, tag_id, feature_id, limit, offset=0, after_banner_id=after_banner_id
+    )
+    body = orjson.dumps(banners, option=JSON_OPTIONS)
+    if len(banners) < limit or not banners:
+        return body, None
+    return body, encode_cursor(banners[-1]["banner_id"])
 
 
-async def delete_banners_by_feat_or_tag_id(feature_id: int, tag_id: int) -> None:
+async def export_banners(tag_id: int | None, feature_id: int | None) -> AsyncIterator[bytes]:
+    """
+    Yields every matching banner as NDJSON, one chunk per database batch.
+    Runs while the response is sent, after the request session is closed, so it uses its own
+    """
+    async with async_session_factory() as session:
+        async with session.begin():
+            async for batch in BannerDAO.stream_banners(
+                session, tag_id, feature_id, cfg.BANNER_EXPORT_BATCH_SIZE
+            ):
+                yield b"".join(orjson.dumps(banner, option=NDJSON_OPTIONS) for banner in batch)
+
+
+async def delete_banners_by_feat_or_tag_id(
+    session: AsyncSession, feature_id: int, tag_id: int
+) -> None:
     if not feature_id and not tag_id:
         raise ErrorNoFeatureOrTagIdProvided
-    await BannerDAO.delete_banners_by_feat_or_tag_id(feature_id, tag_id)
+    deleted_keys = await BannerDAO.delete_banners_by_feat_or_tag_id(session, feature_id, tag_id)
+    run_after_commit(session, lambda: _forget_deleted_banners(deleted_keys))
+
+
+def start_deleting_banners_by_feat_or_tag_id(feature_id: int, tag_id: int) -> Job:
+    if not feature_id and not tag_id:
+        raise ErrorNoFeatureOrTagIdProvided
+    return job_registry.submit(
+        "delete_banners", lambda job: _delete_banners_in_batches(feature_id, tag_id, job)
+    )
+
+
+async def _delete_banners_in_batches(feature_id: int, tag_id: int, job: Job) -> None:
+    """
+    Deletes matching banners BANNER_DELETE_BATCH_SIZE at a time, one short transaction
+    per batch, with a pause between batches.
+    Banners locked by concurrent writers are skipped and waited for once nothing else is left
+    """
+    job.progress.update(deleted_banners=0, batches=0)
+    skip_locked = True
+    while True:
+        async with async_session_factory() as session:
+            async with session.begin():
+                deleted_keys = await BannerDAO.delete_banners_batch_by_feat_or_tag_id(
+                    session, feature_id, tag_id, cfg.BANNER_DELETE_BATCH_SIZE, skip_locked
+                )
+        if not deleted_keys:
+            if not skip_locked:
+                return
+            skip_locked = False
+            continue
+        skip_locked = True
+        await _forget_deleted_banners(deleted_keys)
+        job.progress["deleted_banners"] += len({banner_id for banner_id, _, _ in deleted_keys})
+        job.progress["batches"] += 1
+        await asyncio.sleep(cfg.BANNER_DELETE_BATCH_PAUSE)
+
+
+async def _forget_deleted_banners(deleted_keys: list[tuple[int, int, int]]) -> None:
+    for banner_id in {banner_id for banner_id, _, _ in deleted_keys}:
+        banner_index.discard(banner_id)
+    await _evict_banner_keys((feature_id, tag_id) for _, feature_id, tag_id in deleted_keys)
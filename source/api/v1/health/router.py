@@ -0,0 +1,79 @@
+from fastapi import APIRouter, Depends, status
+from fastapi.responses import JSONResponse
+
+from source.api.v1.banner.dependencies import check_admin_token_header
+from source.api.v1.banner.index import banner_index
+from source.api.v1.banner.schemas import ErrorUserHaveNoAccessSchema, ErrorUserNotAuthorizedSchema
+from source.database import get_pool_stats
+
+router = APIRouter(prefix="/health", tags=["Health"])
+
+
+@router.get(
+    "/live",
+    name="Проверка работоспособности сервиса",
+    status_code=status.HTTP_200_OK,
+    responses={
+        status.HTTP_200_OK: {
+            "description": "Сервис запущен",
+            "content": {"application/json": {"example": {"status": "ok"}}},
+        },
+    },
+)
+async def get_liveness():
+    return {"status": "ok"}
+
+
+@router.get(
+    "/ready",
+    name="Проверка готовности сервиса принимать трафик",
+    status_code=status.HTTP_200_OK,
+    responses={
+        status.HTTP_200_OK: {
+            "description": "Индекс баннеров загружен, сервис готов",
+            "content": {"application/json": {"example": {"status": "ready"}}},
+        },
+        status.HTTP_503_SERVICE_UNAVAILABLE: {
+            "description": "Индекс баннеров еще не загружен",
+            "content": {"application/json": {"example": {"status": "warming_up"}}},
+        },
+    },
+)
+async def get_readiness():
+    if not banner_index.is_loaded:
+        return JSONResponse(
+            content={"status": "warming_up"},
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        )
+    return {"status": "ready"}
+
+
+@router.get(
+    "/pool",
+    name="Состояние пула соединений с базой данных",
+    status_code=status.HTTP_200_OK,
+    dependencies=[
+        Depends(check_admin_token_header),
+    ],
+    responses={
+        status.HTTP_200_OK: {
+            "description": (
+                "Размер пула, занятые, свободные и сверхлимитные соединения,"
+                " число ожидающих соединения запросов и гистограмма времени ожидания"
+            ),
+        },
+        status.HTTP_401_UNAUTHORIZED: {
+            "description": "Пользователь не авторизован",
+            "model": ErrorUserNotAuthorizedSchema,
+        },
+        status.HTTP_403_FORBIDDEN: {
+            "description": "Пользователь не имеет доступа",
+            "model": ErrorUserHaveNoAccessSchema,
+        },
+    },
+)
+async def get_pool_state():
+    """
+    Допустимо использование только с админским токеном
+    """
+    return get_pool_stats() or {}
@@ -0,0 +1,10 @@
+from fastapi import HTTPException, status
+
+
+class ErrorJobNotFound(HTTPException):
+    def __init__(self, job_id: str):
+        detail = f"Задача {job_id} не найдена"
+        super().__init__(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=detail,
+        )
@@ -0,0 +1,54 @@
+from fastapi import APIRouter, Depends, status
+
+from source.api.v1.banner.constants import INTERNAL_SERVER_ERROR_SWAGGER_RESPONSE
+from source.api.v1.banner.dependencies import check_admin_token_header
+from source.api.v1.banner.schemas import ErrorUserHaveNoAccessSchema, ErrorUserNotAuthorizedSchema
+from source.jobs import job_registry
+
+from . import schemas
+from .exceptions import ErrorJobNotFound
+
+router = APIRouter(prefix="/jobs", tags=["Jobs"])
+
+
+@router.get(
+    "/{id}",
+    name="Состояние фоновой задачи",
+    response_model=schemas.JobSchema,
+    status_code=status.HTTP_200_OK,
+    dependencies=[
+        Depends(check_admin_token_header),
+    ],
+    responses={
+        status.HTTP_401_UNAUTHORIZED: {
+            "description": "Пользователь не авторизован",
+            "model": ErrorUserNotAuthorizedSchema,
+        },
+        status.HTTP_403_FORBIDDEN: {
+            "description": "Пользователь не имеет доступа",
+            "model": ErrorUserHaveNoAccessSchema,
+        },
+        status.HTTP_404_NOT_FOUND: {
+            "description": "Задача не найдена",
+            "model": schemas.ErrorJobNotFoundSchema,
+        },
+        status.HTTP_500_INTERNAL_SERVER_ERROR: INTERNAL_SERVER_ERROR_SWAGGER_RESPONSE,
+    },
+)
+async def get_job(id: str):
+    """
+    Допустимо использование только с админским токеном.
+    Задачи выполняются и хранятся в памяти процесса, который их запустил
+    """
+    job = job_registry.get(id)
+    if job is None:
+        raise ErrorJobNotFound(job_id=id)
+    return schemas.JobSchema(
+        id=job.id,
+        kind=job.kind,
+        status=job.status,
+        progress=job.progress,
+        error=job.error,
+        created_at=job.created_at,
+        finished_at=job.finished_at,
+    )
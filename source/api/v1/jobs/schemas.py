@@ -0,0 +1,55 @@
+from datetime import datetime
+
+from pydantic import BaseModel, Field
+
+from source.jobs import JobStatus
+
+
+class JobAcceptedSchema(BaseModel):
+    """Code: 202"""
+
+    job_id: str = Field(
+        title="Идентификатор фоновой задачи",
+        examples=["0f8fad5bd9cb469fa16570867728950e"],
+    )
+
+
+class JobSchema(BaseModel):
+    id: str = Field(
+        title="Идентификатор фоновой задачи",
+        examples=["0f8fad5bd9cb469fa16570867728950e"],
+    )
+    kind: str = Field(
+        title="Тип задачи",
+        examples=["delete_banners"],
+    )
+    status: JobStatus = Field(
+        title="Состояние задачи",
+        examples=[JobStatus.RUNNING],
+    )
+    progress: dict[str, int] = Field(
+        title="Прогресс выполнения",
+        examples=[{"deleted_banners": 1500, "batches": 3}],
+    )
+    error: str | None = Field(
+        title="Причина ошибки, если задача завершилась неудачно",
+        examples=[None],
+    )
+    created_at: datetime = Field(
+        title="Дата создания задачи",
+        description="Дата в формате ISO",
+    )
+    finished_at: datetime | None = Field(
+        title="Дата завершения задачи",
+        description="Дата в формате ISO",
+    )
+
+
+class ErrorJobNotFoundSchema(BaseModel):
+    """Code: 404"""
+
+    detail: str = Field(
+        title="Сообщение об ошибке",
+        description="Задача не найдена",
+        examples=["Задача 0f8fad5bd9cb469fa16570867728950e не найдена"],
+    )
@@ -0,0 +1,41 @@
+from fastapi import APIRouter, Depends, Response, status
+
+from source.api.v1.banner.dependencies import check_admin_token_header
+from source.api.v1.banner.schemas import ErrorUserHaveNoAccessSchema, ErrorUserNotAuthorizedSchema
+from source.metrics import CONTENT_TYPE, metrics_registry
+
+router = APIRouter(tags=["Metrics"])
+
+
+@router.get(
+    "/metrics",
+    name="Метрики сервиса в формате Prometheus",
+    status_code=status.HTTP_200_OK,
+    response_class=Response,
+    dependencies=[
+        Depends(check_admin_token_header),
+    ],
+    responses={
+        status.HTTP_200_OK: {
+            "description": (
+                "Гистограммы длительности запросов по маршрутам и статусам,"
+                " длительности запросов к базе данных по методам DAO,"
+                " счетчики кэша по уровням и состояние пула соединений"
+            ),
+            "content": {CONTENT_TYPE: {}},
+        },
+        status.HTTP_401_UNAUTHORIZED: {
+            "description": "Пользователь не авторизован",
+            "model": ErrorUserNotAuthorizedSchema,
+        },
+        status.HTTP_403_FORBIDDEN: {
+            "description": "Пользователь не имеет доступа",
+            "model": ErrorUserHaveNoAccessSchema,
+        },
+    },
+)
+async def get_metrics():
+    """
+    Допустимо использование только с админским токеном
+    """
+    return Response(content=metrics_registry.render(), media_type=CONTENT_TYPE)
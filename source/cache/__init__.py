@@ -0,0 +1,6 @@
+from .memory import LRUTTLCache
+from .metrics import cache_metrics_collector
+from .redis_cache import RedisCache
+from .single_flight import SingleFlight
+from .stats import CacheStats
+from .two_tier import CacheEntry, TwoTierCache
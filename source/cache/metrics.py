@@ -0,0 +1,66 @@
+import time
+from typing import Callable, Iterator, Protocol
+
+from source.metrics import header_lines, sample_line
+
+from .stats import CacheStats
+from .two_tier import TwoTierCache
+
+_COUNTERS = (
+    ("hits", "Lookups which found the key"),
+    ("misses", "Lookups which did not find the key"),
+    ("stale_hits", "Hits on entries past their soft TTL"),
+    ("sets", "Stored entries"),
+    ("evictions", "Entries evicted to stay within the size limit"),
+    ("errors", "Failed operations, treated as misses"),
+)
+
+
+class CacheIndex(Protocol):
+    """
+    Fully loaded in-process index served in front of a cache
+    """
+
+    stats: CacheStats
+    loaded_at: float | None
+
+    def __len__(self) -> int: ...
+
+
+def cache_metrics_collector(
+    caches: dict[str, TwoTierCache], indexes: dict[str, CacheIndex] | None = None
+) -> Callable[[], Iterator[str]]:
+    """
+    Returns a collector of CacheStats counters of every tier of the given caches by name,
+    an index is reported as the "index" tier of the cache of the same name
+    """
+    indexes = indexes or {}
+
+    def tier_stats() -> Iterator[tuple[dict[str, str], CacheStats]]:
+        for name, index in indexes.items():
+            yield {"cache": name, "tier": "index"}, index.stats
+        for name, cache in caches.items():
+            yield {"cache": name, "tier": "l1"}, cache.l1.stats
+            if cache.l2 is not None:
+                yield {"cache": name, "tier": "l2"}, cache.l2.stats
+
+    def collect() -> Iterator[str]:
+        for counter, help_text in _COUNTERS:
+            metric = f"cache_{counter}_total"
+            yield from header_lines(metric, "counter", help_text)
+            for labels, stats in tier_stats():
+                yield sample_line(metric, labels, getattr(stats, counter))
+        yield from header_lines("cache_entries", "gauge", "Entries held in the in-process tiers")
+        for name, index in indexes.items():
+            yield sample_line("cache_entries", {"cache": name, "tier": "index"}, len(index))
+        for name, cache in caches.items():
+            yield sample_line("cache_entries", {"cache": name, "tier": "l1"}, len(cache.l1))
+        yield from header_lines(
+            "cache_index_age_seconds", "gauge", "Time since the index was last fully loaded"
+        )
+        now = time.time()
+        for name, index in indexes.items():
+            if index.loaded_at is not None:
+                yield sample_line("cache_index_age_seconds", {"cache": name}, now - index.loaded_at)
+
+    return collect
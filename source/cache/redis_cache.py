@@ -0,0 +1,93 @@
+from logging import getLogger
+from typing import Iterable
+
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from .stats import CacheStats
+
+logger = getLogger(__name__)
+
+
+class RedisCache:
+    """
+    Shared cache tier storing raw bytes in Redis.
+
+    Redis failures are logged and reported as misses, so an unavailable Redis
+    degrades the service to database reads instead of failing requests.
+    """
+
+    def __init__(self, redis: Redis, prefix: str, ttl: float):
+        self.redis = redis
+        self.prefix = prefix
+        self.ttl = ttl
+        self.stats = CacheStats()
+
+    def _make_key(self, key: str) -> str:
+        return f"{self.prefix}:{key}"
+
+    async def get(self, key: str) -> bytes | None:
+        try:
+            value = await self.redis.get(self._make_key(key))
+        except RedisError as e:
+            self.stats.errors += 1
+            logger.warning(f"Error while reading {key} from redis: {e}")
+            return None
+        if value is None:
+            self.stats.misses += 1
+        else:
+            self.stats.hits += 1
+        return value
+
+    async def get_many(self, keys: list[str]) -> list[bytes | None]:
+        """
+        Reads every key with one MGET, values are returned in the order of `keys`
+        """
+        if not keys:
+            return []
+        try:
+            values = await self.redis.mget([self._make_key(key) for key in keys])
+        except RedisError as e:
+            self.stats.errors += 1
+            logger.warning(f"Error while reading {len(keys)} keys from redis: {e}")
+            return [None] * len(keys)
+        hits = sum(value is not None for value in values)
+        self.stats.hits += hits
+        self.stats.misses += len(keys) - hits
+        return values
+
+    async def set(self, key: str, value: bytes, ttl: float | None = None) -> None:
+        ttl = self.ttl if ttl is None else ttl
+        try:
+            await self.redis.set(self._make_key(key), value, px=int(ttl * 1000))
+        except RedisError as e:
+            self.stats.errors += 1
+            logger.warning(f"Error while writing {key} to redis: {e}")
+            return
+        self.stats.sets += 1
+
+    async def set_many(self, items: Iterable[tuple[str, bytes, float]]) -> None:
+        """
+        Sets every (key, value, ttl) item in one pipelined round-trip
+        """
+        count = 0
+        try:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                for key, value, ttl in items:
+                    pipe.set(self._make_key(key), value, px=int(ttl * 1000))
+                    count += 1
+                await pipe.execute()
+        except RedisError as e:
+            self.stats.errors += 1
+            logger.warning(f"Error while writing {count} keys to redis: {e}")
+            return
+        self.stats.sets += count
+
+    async def delete(self, *keys: str) -> None:
+        if not keys:
+            return
+        try:
+            await self.redis.delete(*(self._make_key(key) for key in keys))
+        except RedisError as e:
+            self.stats.errors += 1
+            logger.warning(f"Error while deleting {keys} from redis: {e}")
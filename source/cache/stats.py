@@ -0,0 +1,21 @@
+from dataclasses import dataclass
+
+
+@dataclass(slots=True)
+class CacheStats:
+    """
+    Hit/miss counters of a single cache tier
+    """
+
+    hits: int = 0
+    misses: int = 0
+    # hits on entries past their soft TTL, served while they are refreshed
+    stale_hits: int = 0
+    sets: int = 0
+    evictions: int = 0
+    errors: int = 0
+
+    @property
+    def hit_ratio(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
@@ -0,0 +1,125 @@
+import random
+import struct
+import time
+from typing import Callable, Generic, NamedTuple, TypeVar
+
+from .memory import LRUTTLCache
+from .redis_cache import RedisCache
+from .stats import CacheStats
+
+V = TypeVar("V")
+
+# soft and hard expiration timestamps prepended to every value stored in L2
+_EXPIRES_AT = struct.Struct("!dd")
+_HEADER_SIZE = _EXPIRES_AT.size
+
+
+class CacheEntry(NamedTuple, Generic[V]):
+    value: V
+    soft_expires_at: float
+
+    @property
+    def is_stale(self) -> bool:
+        return self.soft_expires_at <= time.time()
+
+
+class TwoTierCache(Generic[V]):
+    """
+    In-process LRU/TTL tier (L1) in front of a shared Redis tier (L2).
+
+    L1 holds decoded values, L2 holds values encoded with `encode`. An L2 hit is
+    decoded once and promoted to L1. Until `l2` is set the cache works with L1 only.
+
+    Every entry has a soft and a hard TTL, both shortened by a random part of `jitter`
+    so that keys written together do not expire together. After the soft TTL the entry
+    is still returned but marked stale, after the hard TTL it is gone from both tiers.
+    """
+
+    def __init__(
+        self,
+        l1: LRUTTLCache[CacheEntry[V]],
+        encode: Callable[[V], bytes],
+        decode: Callable[[bytes], V],
+        soft_ttl: float,
+        hard_ttl: float,
+        jitter: float = 0.0,
+        l2: RedisCache | None = None,
+    ):
+        self.l1 = l1
+        self.l2 = l2
+        self.soft_ttl = soft_ttl
+        self.hard_ttl = hard_ttl
+        self.jitter = jitter
+        self._encode = encode
+        self._decode = decode
+
+    async def get(self, key: str) -> V | None:
+        entry = await self.get_entry(key)
+        return entry.value if entry is not None else None
+
+    async def get_entry(self, key: str) -> CacheEntry[V] | None:
+        entry = self.l1.get(key)
+        if entry is not None:
+            return self._count_stale(self.l1.stats, entry)
+        if self.l2 is None:
+            return None
+        data = await self.l2.get(key)
+        if data is None:
+            return None
+        return self._promote(key, data)
+
+    async def get_entries(self, keys: list[str]) -> dict[str, CacheEntry[V]]:
+        """
+        Returns entries of the found keys: L1 first, then one L2 round trip for the rest
+        """
+        entries = {}
+        l1_misses = []
+        for key in keys:
+            entry = self.l1.get(key)
+            if entry is not None:
+                entries[key] = self._count_stale(self.l1.stats, entry)
+            else:
+                l1_misses.append(key)
+        if not l1_misses or self.l2 is None:
+            return entries
+        for key, data in zip(l1_misses, await self.l2.get_many(l1_misses)):
+            if data is not None:
+                entries[key] = self._promote(key, data)
+        return entries
+
+    def _promote(self, key: str, data: bytes) -> CacheEntry[V]:
+        soft_expires_at, hard_expires_at = _EXPIRES_AT.unpack_from(data)
+        entry = CacheEntry(self._decode(data[_HEADER_SIZE:]), soft_expires_at)
+        # the L1 copy must not outlive the L2 entry it comes from
+        self.l1.set(key, entry, ttl=min(self.l1.ttl, hard_expires_at - time.time()))
+        return self._count_stale(self.l2.stats, entry)
+
+    @staticmethod
+    def _count_stale(stats: CacheStats, entry: CacheEntry[V]) -> CacheEntry[V]:
+        if entry.is_stale:
+            stats.stale_hits += 1
+        return entry
+
+    async def set(self, key: str, value: V) -> None:
+        await self.set_many({key: value})
+
+    async def set_many(self, items: dict[str, V]) -> None:
+        l2_items = []
+        now = time.time()
+        for key, value in items.items():
+            ttl_factor = 1 - self.jitter * random.random()
+            hard_ttl = self.hard_ttl * ttl_factor
+            entry = CacheEntry(value, now + min(self.soft_ttl * ttl_factor, hard_ttl))
+            self.l1.set(key, entry, ttl=min(self.l1.ttl * ttl_factor, hard_ttl))
+            if self.l2 is not None:
+                header = _EXPIRES_AT.pack(entry.soft_expires_at, now + hard_ttl)
+                data = header + self._encode(value)
+                l2_items.append((key, data, hard_ttl))
+        if l2_items:
+            await self.l2.set_many(l2_items)
+
+    async def delete(self, *keys: str) -> None:
+        for key in keys:
+            self.l1.delete(key)
+        if self.l2 is not None:
+            await self.l2.delete(*keys)
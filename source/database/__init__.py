@@ -1,2 +1,10 @@
 from .base_orm import BaseORM
-from .engine import async_session_factory
+from .engine import (
+    async_engine,
+    async_session_factory,
+    autocommit_engine,
+    get_pool_stats,
+    warm_up_pool,
+)
+from .metrics import timed_query
+from .session import get_session, run_after_commit
@@ -1,16 +1,82 @@
-from sqlalchemy import NullPool
+import asyncio
+from logging import getLogger
+from typing import Any, Sequence
+
+from sqlalchemy import Executable, NullPool
 from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 
 from config import configuration as cfg
 
+from .pool import InstrumentedAsyncAdaptedQueuePool
+
+logger = getLogger(__name__)
+
 if cfg.MODE == "TEST":
     DATABASE_URL = cfg.TEST_DATABASE_URL
     DATABASE_PARAMS = {"poolclass": NullPool}
 else:
     DATABASE_URL = cfg.ASYNC_DATABASE_URL
-    DATABASE_PARAMS = {}
+    DATABASE_PARAMS = {
+        "poolclass": InstrumentedAsyncAdaptedQueuePool,
+        "pool_size": cfg.DB_POOL_SIZE,
+        "max_overflow": cfg.DB_MAX_OVERFLOW,
+        "pool_timeout": cfg.DB_POOL_TIMEOUT,
+        "pool_recycle": cfg.DB_POOL_RECYCLE,
+        "pool_pre_ping": cfg.DB_POOL_PRE_PING,
+    }
 
 
-async_engine = create_async_engine(DATABASE_URL, **DATABASE_PARAMS)
+async_engine = create_async_engine(
+    DATABASE_URL,
+    connect_args={
+        "prepared_statement_cache_size": cfg.DB_PREPARED_STATEMENT_CACHE_SIZE,
+        "timeout": cfg.DB_CONNECT_TIMEOUT,
+    },
+    **DATABASE_PARAMS,
+)
+
+# same pool, for single-statement reads: without a transaction asyncpg sends no BEGIN
+# before the statement and no ROLLBACK when the connection is returned
+autocommit_engine = async_engine.execution_options(isolation_level="AUTOCOMMIT")
 
 async_session_factory = async_sessionmaker(async_engine)
+
+
+async def warm_up_pool(statements: Sequence[tuple[Executable, dict[str, Any]]] = ()) -> None:
+    """
+    Opens `pool_size` connections at once and runs `statements` on each of them,
+    so the first requests neither connect nor prepare the hot statements.
+    Failures are logged, the connections which did open are warmed up
+    and returned to the pool in any case
+    """
+    if not isinstance(async_engine.pool, InstrumentedAsyncAdaptedQueuePool):
+        return
+    connections = [async_engine.connect() for _ in range(cfg.DB_POOL_SIZE)]
+    try:
+        results = await asyncio.gather(
+            *(connection.start() for connection in connections), return_exceptions=True
+        )
+        _log_errors(results, "pool connections failed to open during warm-up")
+        opened = [connection for connection in connections if connection.sync_connection]
+        for statement, params in statements:
+            results = await asyncio.gather(
+                *(connection.execute(statement, params) for connection in opened),
+                return_exceptions=True,
+            )
+            _log_errors(results, "warm-up statements failed")
+    finally:
+        await asyncio.gather(
+            *(connection.close() for connection in connections if connection.sync_connection)
+        )
+
+
+def _log_errors(results: list, message: str) -> None:
+    errors = [result for result in results if isinstance(result, BaseException)]
+    if errors:
+        logger.warning(f"{len(errors)} of {len(results)} {message}: {errors[0]}")
+
+
+def get_pool_stats() -> dict | None:
+    if not isinstance(async_engine.pool, InstrumentedAsyncAdaptedQueuePool):
+        return None
+    return async_engine.pool.stats()
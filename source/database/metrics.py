@@ -0,0 +1,41 @@
+from typing import Iterator
+
+from source.metrics import header_lines, histogram_lines, metrics_registry, sample_line, timed
+
+from .engine import async_engine
+from .pool import InstrumentedAsyncAdaptedQueuePool
+
+query_duration = metrics_registry.histogram(
+    "db_query_duration_seconds",
+    "Duration of DAO methods, including waiting for a connection",
+    ("method",),
+)
+
+# decorator for DAO coroutine methods, below @classmethod
+timed_query = timed(query_duration)
+
+_POOL_GAUGES = (
+    ("size", "Configured number of persistent connections"),
+    ("checked_out", "Connections in use"),
+    ("idle", "Connections available in the pool"),
+    ("overflow", "Connections opened over the pool size"),
+    ("waiting", "Callers waiting for a connection"),
+)
+
+
+def collect_pool_metrics() -> Iterator[str]:
+    pool = async_engine.pool
+    if not isinstance(pool, InstrumentedAsyncAdaptedQueuePool):
+        return
+    stats = pool.stats()
+    for gauge, help_text in _POOL_GAUGES:
+        metric = f"db_pool_{gauge}"
+        yield from header_lines(metric, "gauge", help_text)
+        yield sample_line(metric, {}, stats[gauge])
+    yield from header_lines(
+        "db_pool_wait_seconds", "histogram", "Time spent waiting for a pool connection"
+    )
+    yield from histogram_lines("db_pool_wait_seconds", {}, pool.wait_time)
+
+
+metrics_registry.register_collector(collect_pool_metrics)
@@ -0,0 +1,35 @@
+import time
+
+from sqlalchemy import AsyncAdaptedQueuePool
+
+from source.metrics import Histogram
+
+
+class InstrumentedAsyncAdaptedQueuePool(AsyncAdaptedQueuePool):
+    """
+    Queue pool which also counts callers waiting for a connection and how long they wait
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.waiting = 0
+        self.wait_time = Histogram()
+
+    def _do_get(self):
+        self.waiting += 1
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            self.waiting -= 1
+            self.wait_time.observe(time.perf_counter() - start)
+
+    def stats(self) -> dict:
+        return {
+            "size": self.size(),
+            "checked_out": self.checkedout(),
+            "idle": self.checkedin(),
+            "overflow": max(self.overflow(), 0),
+            "waiting": self.waiting,
+            "wait_time_seconds": self.wait_time.snapshot(),
+        }
@@ -0,0 +1,36 @@
+from logging import getLogger
+from typing import AsyncIterator, Awaitable, Callable
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .engine import async_session_factory
+
+logger = getLogger(__name__)
+
+_AFTER_COMMIT = "after_commit"
+
+
+async def get_session() -> AsyncIterator[AsyncSession]:
+    """
+    Request-scoped unit of work: one session and one transaction shared by every
+    dependency and DAO call of the request, committed once when the endpoint returns
+    (before the response is sent) and rolled back if it raises.
+
+    Callbacks registered with `run_after_commit` are awaited after a successful commit
+    """
+    async with async_session_factory() as session:
+        async with session.begin():
+            yield session
+        for callback in session.info.pop(_AFTER_COMMIT, ()):
+            try:
+                await callback()
+            except Exception as e:
+                logger.error(f"Error in after commit callback: {e}")
+
+
+def run_after_commit(session: AsyncSession, callback: Callable[[], Awaitable[None]]) -> None:
+    """
+    Defers side effects which must not be seen unless the transaction commits
+    (cache write-through, eviction) until `get_session` commits
+    """
+    session.info.setdefault(_AFTER_COMMIT, []).append(callback)
@@ -0,0 +1 @@
+from .registry import Job, JobRegistry, JobStatus, job_registry
@@ -0,0 +1,100 @@
+import asyncio
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from enum import StrEnum
+from logging import getLogger
+from typing import Awaitable, Callable
+from uuid import uuid4
+
+from config import configuration as cfg
+from source.database.custom_data_types import utc_now
+
+logger = getLogger(__name__)
+
+
+class JobStatus(StrEnum):
+    PENDING = "pending"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+
+@dataclass(slots=True)
+class Job:
+    """
+    State of a background job, `progress` is updated by the job itself
+    """
+
+    kind: str
+    id: str = field(default_factory=lambda: uuid4().hex)
+    status: JobStatus = JobStatus.PENDING
+    progress: dict[str, int] = field(default_factory=dict)
+    error: str | None = None
+    created_at: datetime = field(default_factory=utc_now)
+    finished_at: datetime | None = None
+
+
+class JobRegistry:
+    """
+    In-process registry of background jobs.
+
+    Jobs are run as tasks of the current event loop and are known only to the worker
+    which started them. Finished jobs are kept for `ttl` seconds.
+    """
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._jobs: dict[str, Job] = {}
+        self._finished: dict[str, float] = {}
+        self._tasks: dict[str, asyncio.Task] = {}
+
+    def __len__(self) -> int:
+        return len(self._jobs)
+
+    def get(self, job_id: str) -> Job | None:
+        self._forget_expired()
+        return self._jobs.get(job_id)
+
+    def submit(self, kind: str, func: Callable[[Job], Awaitable[None]]) -> Job:
+        self._forget_expired()
+        job = Job(kind=kind)
+        self._jobs[job.id] = job
+        self._tasks[job.id] = asyncio.create_task(self._run(job, func))
+        return job
+
+    async def cancel_all(self) -> None:
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _run(self, job: Job, func: Callable[[Job], Awaitable[None]]) -> None:
+        job.status = JobStatus.RUNNING
+        try:
+            await func(job)
+        except asyncio.CancelledError:
+            job.status = JobStatus.FAILED
+            job.error = "cancelled"
+            raise
+        except Exception as e:
+            logger.error(f"Job {job.kind} {job.id} failed: {e}")
+            job.status = JobStatus.FAILED
+            job.error = str(e)
+        else:
+            job.status = JobStatus.SUCCEEDED
+        finally:
+            job.finished_at = utc_now()
+            self._finished[job.id] = time.monotonic()
+            del self._tasks[job.id]
+
+    def _forget_expired(self) -> None:
+        expired_before = time.monotonic() - self.ttl
+        for job_id, finished_at in list(self._finished.items()):
+            if finished_at > expired_before:
+                break
+            del self._finished[job_id]
+            del self._jobs[job_id]
+
+
+job_registry = JobRegistry(ttl=cfg.JOB_RESULT_TTL)
@@ -0,0 +1,12 @@
+from .histogram import DEFAULT_BUCKETS, Histogram
+from .middleware import MetricsMiddleware
+from .registry import (
+    CONTENT_TYPE,
+    HistogramFamily,
+    MetricsRegistry,
+    header_lines,
+    histogram_lines,
+    metrics_registry,
+    sample_line,
+)
+from .timing import timed
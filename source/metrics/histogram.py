@@ -0,0 +1,43 @@
+from bisect import bisect_left
+from typing import Sequence
+
+# seconds, from sub-millisecond cache hits to requests far over the 50 ms SLI
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+
+class Histogram:
+    """
+    Fixed-bucket histogram, one bisect and three additions per observation
+    """
+
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        # the last slot counts values above the largest bucket
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative_counts(self) -> list[tuple[str, int]]:
+        """
+        Returns (upper bound, number of values <= bound) pairs, the last bound is "+Inf"
+        """
+        result = []
+        total = 0
+        for bound, count in zip((*map(str, self.buckets), "+Inf"), self.counts):
+            total += count
+            result.append((bound, total))
+        return result
+
+    def snapshot(self) -> dict[str, float | int | dict[str, int]]:
+        return {
+            "buckets": dict(self.cumulative_counts()),
+            "sum": self.sum,
+            "count": self.count,
+        }
@@ -0,0 +1,44 @@
+import time
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from source.middleware.response_status import ResponseStatusSend
+
+from .registry import metrics_registry
+
+http_request_duration = metrics_registry.histogram(
+    "http_request_duration_seconds",
+    "Duration of HTTP requests until the response is sent",
+    ("method", "route", "status"),
+)
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware recording the duration of every HTTP request by method,
+    route template (not the raw path, to keep the number of series bounded) and status
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        send_with_status = ResponseStatusSend(send)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            # the router stores the matched route in the shared scope
+            route = scope.get("route")
+            http_request_duration.observe(
+                (
+                    scope["method"],
+                    route.path if route else "unmatched",
+                    str(send_with_status.status_code),
+                ),
+                time.perf_counter() - start,
+            )
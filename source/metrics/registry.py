@@ -0,0 +1,103 @@
+from typing import Callable, Iterable, Iterator, Sequence
+
+from .histogram import DEFAULT_BUCKETS, Histogram
+
+# Prometheus text exposition format
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+Collector = Callable[[], Iterable[str]]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(str(value))}"' for name, value in labels.items()) + "}"
+
+
+def header_lines(name: str, metric_type: str, help_text: str) -> list[str]:
+    return [f"# HELP {name} {help_text}", f"# TYPE {name} {metric_type}"]
+
+
+def sample_line(name: str, labels: dict[str, str], value: float) -> str:
+    return f"{name}{_format_labels(labels)} {value}"
+
+
+def histogram_lines(name: str, labels: dict[str, str], histogram: Histogram) -> list[str]:
+    lines = [
+        sample_line(f"{name}_bucket", {**labels, "le": bound}, count)
+        for bound, count in histogram.cumulative_counts()
+    ]
+    lines.append(sample_line(f"{name}_sum", labels, histogram.sum))
+    lines.append(sample_line(f"{name}_count", labels, histogram.count))
+    return lines
+
+
+class HistogramFamily:
+    """
+    Histograms of one metric by label values, created on the first observation.
+    Recording is a dict lookup plus Histogram.observe
+    """
+
+    __slots__ = ("name", "help", "labelnames", "buckets", "histograms")
+
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self.buckets = buckets
+        self.histograms: dict[tuple[str, ...], Histogram] = {}
+
+    def observe(self, labels: tuple[str, ...], value: float) -> None:
+        histogram = self.histograms.get(labels)
+        if histogram is None:
+            histogram = self.histograms[labels] = Histogram(self.buckets)
+        histogram.observe(value)
+
+    def collect(self) -> Iterator[str]:
+        yield from header_lines(self.name, "histogram", self.help)
+        for labels, histogram in list(self.histograms.items()):
+            yield from histogram_lines(self.name, dict(zip(self.labelnames, labels)), histogram)
+
+
+class MetricsRegistry:
+    """
+    Metrics recorded as they happen (histogram families) and collectors which read
+    the state of other components (caches, connection pool) when metrics are scraped
+    """
+
+    def __init__(self):
+        self._collectors: list[Collector] = []
+
+    def histogram(
+        self,
+        name: str,
+        help_text: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> HistogramFamily:
+        family = HistogramFamily(name, help_text, labelnames, buckets)
+        self.register_collector(family.collect)
+        return family
+
+    def register_collector(self, collector: Collector) -> None:
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        lines = []
+        for collector in self._collectors:
+            lines.extend(collector())
+        lines.append("")
+        return "\n".join(lines)
+
+
+metrics_registry = MetricsRegistry()
@@ -0,0 +1,32 @@
+import functools
+import time
+from typing import Awaitable, Callable, ParamSpec, TypeVar
+
+from .registry import HistogramFamily
+
+P = ParamSpec("P")
+R = TypeVar("R")
+
+
+def timed(
+    family: HistogramFamily,
+) -> Callable[[Callable[P, Awaitable[R]]], Callable[P, Awaitable[R]]]:
+    """
+    Records the duration of every call of a coroutine function in `family`,
+    labelled with the function qualified name (e.g. "BannerDAO.get_banners")
+    """
+
+    def decorator(func: Callable[P, Awaitable[R]]) -> Callable[P, Awaitable[R]]:
+        labels = (func.__qualname__,)
+
+        @functools.wraps(func)
+        async def wrapper(*args: P.args, **kwargs: P.kwargs) -> R:
+            start = time.perf_counter()
+            try:
+                return await func(*args, **kwargs)
+            finally:
+                family.observe(labels, time.perf_counter() - start)
+
+        return wrapper
+
+    return decorator
@@ -1,27 +1,91 @@
+import itertools
+import os
 import random
-import string
 import time
 
-from fastapi import Request
-from starlette.middleware.base import BaseHTTPMiddleware, RequestResponseEndpoint
-
-
-class ProcessTimeLogMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next: RequestResponseEndpoint):
-        req_uid = "".join(random.choices(string.ascii_uppercase + string.digits, k=16))
-        start_time = time.time()
-        # request_body = await request.body()
-        request_params = request.query_params
-        request.app.logger.info(
-            f"Request {req_uid} for operation {request.url.path}"
-            f" received from IP {request.client.host}"
-            # f"{'with body ' + json.loads(request_body) if request_body else ''}"
-            f"{'with params ' + str(request_params) if request_params else ''}"
-        )
-        response = await call_next(request)
-        time_spent = f"{(time.time() - start_time):0.3f} seconds"
-        request.app.logger.info(
-            f"Request {req_uid} for operation {request.url.path}"
-            f" completed from IP {request.client.host} in {time_spent}"
-        )
-        return response
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from config import configuration as cfg
+
+from .response_status import ResponseStatusSend
+
+
+class ProcessTimeLogMiddleware:
+    """
+    Pure ASGI middleware logging HTTP requests through `app.logger`.
+
+    A LOG_REQUEST_SAMPLE_RATE share of requests is logged when received and when completed,
+    requests slower than LOG_SLOW_REQUEST_THRESHOLD are logged as warnings when completed
+    whether sampled or not. Messages are formatted by the logger, only when they are emitted.
+    Request ids are the worker pid and a per-worker counter
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        sample_rate: float = cfg.LOG_REQUEST_SAMPLE_RATE,
+        slow_request_threshold: float = cfg.LOG_SLOW_REQUEST_THRESHOLD,
+    ):
+        self.app = app
+        self.sample_rate = sample_rate
+        self.slow_request_threshold = slow_request_threshold
+        self._id_prefix = f"{os.getpid():x}-"
+        self._request_numbers = itertools.count(1)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_number = next(self._request_numbers)
+        sampled = self.sample_rate >= 1 or random.random() < self.sample_rate
+        logger = scope["app"].logger
+        if sampled:
+            logger.info(
+                "Request {}{} for operation {} received from IP {}{}",
+                self._id_prefix,
+                request_number,
+                scope["path"],
+                _client_host(scope),
+                _query_params(scope),
+            )
+
+        send_with_status = ResponseStatusSend(send)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            time_spent = time.perf_counter() - start
+            if time_spent >= self.slow_request_threshold:
+                logger.warning(
+                    "Slow request {}{} for operation {}{} completed from IP {}"
+                    " with status {} in {:0.3f} seconds",
+                    self._id_prefix,
+                    request_number,
+                    scope["path"],
+                    _query_params(scope),
+                    _client_host(scope),
+                    send_with_status.status_code,
+                    time_spent,
+                )
+            elif sampled:
+                logger.info(
+                    "Request {}{} for operation {} completed from IP {}"
+                    " with status {} in {:0.3f} seconds",
+                    self._id_prefix,
+                    request_number,
+                    scope["path"],
+                    _client_host(scope),
+                    send_with_status.status_code,
+                    time_spent,
+                )
+
+
+def _client_host(scope: Scope) -> str | None:
+    client = scope.get("client")
+    return client[0] if client else None
+
+
+def _query_params(scope: Scope) -> str:
+    query_string = scope.get("query_string")
+    return f" with params {query_string.decode('latin-1')}" if query_string else ""
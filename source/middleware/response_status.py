@@ -0,0 +1,19 @@
+from starlette.types import Message, Send
+
+
+class ResponseStatusSend:
+    """
+    ASGI `send` wrapper remembering the status of the response it sends.
+    The status stays 500 if the application fails before the response starts
+    """
+
+    __slots__ = ("send", "status_code")
+
+    def __init__(self, send: Send):
+        self.send = send
+        self.status_code = 500
+
+    async def __call__(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            self.status_code = message["status"]
+        await self.send(message)